@@ -0,0 +1,128 @@
+"""
+main is the entry point of the mimus command.
+"""
+import asyncio
+import time
+from pathlib import Path
+
+import click
+
+from .. import __version__
+from ..config.error import ConfigError
+from ..config.parser import Parser
+from ..runtime.adapters import get_adapter
+from ..runtime.loadgen import build_request, run_load, summarize
+from ..runtime.server import HTTPAdapter, Runtime
+from ..runtime.tls import uses_tls
+
+__all__ = ("main",)
+
+
+def is_http(service):
+    try:
+        return isinstance(get_adapter(service.protocol), HTTPAdapter)
+    except ConfigError:
+        return False
+
+
+def load_parser(config):
+    path = Path(config)
+    try:
+        return Parser.parse(path.read_text(), path.parent, str(path))
+    except ConfigError as e:
+        raise click.ClickException(str(e)) from e
+
+
+@click.group()
+@click.version_option(__version__)
+def main():
+    """Create mock services with ease."""
+
+
+@main.command()
+@click.argument("config", type=click.Path(exists=True, dir_okay=False))
+@click.option("--host", default="127.0.0.1", show_default=True)
+def run(config, host):
+    """Run the services defined in CONFIG."""
+    parser = load_parser(config)
+
+    async def serve():
+        runtime = Runtime.from_parser(parser, host=host)
+        ports = await runtime.start()
+        for name, port in ports.items():
+            click.echo(f"{name}: {host}:{port}")
+        try:
+            await asyncio.gather(*(s.serve_forever() for s in runtime.servers))
+        finally:
+            await runtime.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command()
+@click.argument("config", type=click.Path(exists=True, dir_okay=False))
+@click.option("--service", "names", multiple=True, help="Only benchmark these.")
+@click.option("--duration", default=5.0, show_default=True, help="Seconds.")
+@click.option("--connections", default=16, show_default=True)
+@click.option("--processes", default=1, show_default=True)
+def bench(config, names, duration, connections, processes):
+    """Benchmark the services defined in CONFIG.
+
+    The services run in this process and are driven, one at a time, by load
+    generator processes over persistent connections. CPU time is the time
+    spent by the services' process. Only HTTP services can be benchmarked,
+    the others are skipped.
+    """
+    parser = load_parser(config)
+    services = list(parser.iter_service())
+    if names:
+        unknown = set(names) - {service.name for service in services}
+        if unknown:
+            raise click.BadParameter(f"unknown service(s) {', '.join(unknown)}")
+        services = [service for service in services if service.name in names]
+        other = [service.name for service in services if not is_http(service)]
+        if other:
+            raise click.BadParameter(f"not HTTP service(s) {', '.join(other)}")
+    services = [service for service in services if is_http(service)]
+
+    async def run_bench():
+        loop = asyncio.get_event_loop()
+        async with Runtime(services) as runtime:
+            results = []
+            for service in services:
+                request = build_request(service)
+
+                cpu = time.process_time()
+                latencies, errors, elapsed = await loop.run_in_executor(
+                    None,
+                    run_load,
+                    runtime.host,
+                    runtime.ports[service.name],
+                    request,
+                    duration,
+                    connections,
+                    processes,
+                    uses_tls(service),
+                )
+                cpu = time.process_time() - cpu
+
+                results.append(
+                    (service.name, summarize(latencies, errors, elapsed, cpu))
+                )
+
+            return results
+
+    click.echo(
+        f"{'service':<24} {'requests':>9} {'errors':>7} {'rps':>10} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8} {'cpu/req us':>10}"
+    )
+    for name, result in asyncio.run(run_bench()):
+        click.echo(
+            f"{name:<24} {result.requests:>9} {result.errors:>7} "
+            f"{result.rps:>10.0f} {result.p50 * 1e3:>8.2f} "
+            f"{result.p99 * 1e3:>8.2f} {result.p999 * 1e3:>8.2f} "
+            f"{result.cpu_per_request * 1e6:>10.1f}"
+        )
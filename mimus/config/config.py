@@ -13,14 +13,20 @@ class Config:
     Config stores and validates configuration.
     """
 
-    def __init__(self, *, services, includes, path, version):
+    def __init__(self, *, services, includes, path, version, symbols=None):
         super().__init__()
 
         self.path = path
         self.version = version
         self.includes = includes or {}
         self.services = services or []
-        self._service_map = {srv.get("name"): srv for srv in self.services}
+
+        # Reuse the symbol table built by the parser if there is one instead
+        # of indexing the services again.
+        if symbols is not None:
+            self._service_map = symbols.services
+        else:
+            self._service_map = {srv.get("name"): srv for srv in self.services}
 
 
 class Service:
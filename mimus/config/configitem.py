@@ -69,17 +69,18 @@ class ConfigItem(SimpleNamespace):
         cls._defaults = defaults
 
     def copy(self, post_init=False):
-        new_obj = self.__class__.__new__(self.__class__)
-
         if post_init:
+            new_obj = self.__class__.__new__(self.__class__)
             self.__class__.__init__(new_obj, **self.to_dict())
             return new_obj
 
-        setattr(new_obj, "_disable_post_init", True)
-        self.__class__.__init__(new_obj, **self.to_dict())
-        delattr(new_obj, "_disable_post_init")
+        return _restore(self.__class__, self.to_dict())
 
-        return new_obj
+    def __reduce__(self):
+        # SimpleNamespace unpickles by calling the class without arguments,
+        # which fails on required fields. The values have been transformed
+        # and validated already, so restore them without post init.
+        return (_restore, (self.__class__, self.to_dict()))
 
     @classmethod
     def from_dict(cls, d):
@@ -97,3 +98,13 @@ class ConfigItem(SimpleNamespace):
     def __repr__(self):
         arg_list = ", ".join(f"{k}={getattr(self, k)!r}" for k in self._fields)
         return f"{type(self).__name__}({arg_list})"
+
+
+def _restore(cls, fields):
+    obj = cls.__new__(cls)
+
+    setattr(obj, "_disable_post_init", True)
+    cls.__init__(obj, **fields)
+    delattr(obj, "_disable_post_init")
+
+    return obj
@@ -1,6 +1,9 @@
 from types import SimpleNamespace
 
-__all__ = ("ConfigError",)
+__all__ = (
+    "ConfigError",
+    "ConfigErrorGroup",
+)
 
 
 class ConfigError(Exception):
@@ -10,11 +13,25 @@ class ConfigError(Exception):
         super().__init__(reason)
 
     def __str__(self):
-        if self.meta.__dict__:
-            meta = ", ".join(
-                f"{k}={v}" for k, v in self.meta.__dict__.items() if bool(v)
-            )
-
+        meta = ", ".join(f"{k}={v}" for k, v in self.meta.__dict__.items() if bool(v))
+        if meta:
             return f"{super().__str__()} ({meta})"
 
         return super().__str__()
+
+
+class ConfigErrorGroup(ConfigError):
+    """Aggregates several `ConfigError` so that one run can report every
+    invalid item instead of only the first one.
+    """
+
+    def __init__(self, errors, **meta):
+        self.errors = list(errors)
+
+        super().__init__(f"{len(self.errors)} invalid config item(s)", **meta)
+
+    def __str__(self):
+        lines = [super().__str__()]
+        lines.extend(f"  - {error}" for error in self.errors)
+
+        return "\n".join(lines)
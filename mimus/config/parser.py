@@ -3,12 +3,16 @@ parser parses config files
 """
 from pathlib import Path
 from collections import namedtuple
+from functools import partial
+from itertools import repeat
 import textwrap
 
 import ruamel.yaml as yaml
 
 from .configitem import ConfigItem
-from .error import ConfigError
+from .error import ConfigError, ConfigErrorGroup
+from .symbols import SymbolTable
+from .validate import validate_services
 
 __all__ = (
     "CURRENT_VERSION",
@@ -24,24 +28,31 @@ __all__ = (
 
 CURRENT_VERSION = 0
 SUPPORTED_VERSIONS = (0,)
+TLS_FIELDS = ("tlscert", "tlskey")
 
 
 class Parser:
     def __init__(self):
         self.root = None
-        self.services = {}
+        self.symbols = SymbolTable()
+        self.services = self.symbols.services
         self.imports = {}
-        self.stacks = {}
+        self.stacks = self.symbols.stacks
         self.configs = {}
+        self.lines = {}
 
-    def parse_and_register_config(self, content, cwd, file):
+    def parse_and_register_config(self, content, cwd, file, workers=None):
         cwd = cwd.resolve()
         if file != "":
             file = str(Path(file).resolve())
 
         if file not in self.configs:
             try:
-                self.configs[file] = ConfigFile.loads(content, cwd)
+                obj = ConfigFile.load_obj(content)
+                self.lines[file] = ConfigFile.item_lines(obj)
+                self.configs[file] = ConfigFile.from_obj(obj, cwd, workers=workers)
+            except ConfigErrorGroup as e:
+                raise ConfigErrorGroup(e.errors, file=file) from e
             except ConfigError as e:
                 raise ConfigError(e, file=file) from e
 
@@ -51,30 +62,17 @@ class Parser:
         if imp.path not in self.imports:
             self.imports[imp.path] = imp
 
-    def register_stack(self, stack):
-        if stack.name not in self.stacks:
-            self.stacks[stack.name] = stack
-            return
+    def register_stack(self, stack, file="", line=None):
+        self.symbols.add_stack(stack, file, line)
 
-        prev = self.imports[stack.name]
-        if prev.services != stack.services:
-            raise ConfigError(
-                f"Duplicate stack name '{stack.name}' but different services list"
-                f"{prev.services} and {stack.services} found."
-            )
-
-    def register_service(self, service):
-        if service.name not in self.services:
-            self.services[service.name] = service
-            return
-
-        raise ConfigError(f"Duplicate service name '{service.name}' found")
+    def register_service(self, service, file="", line=None):
+        self.symbols.add_service(service, file, line)
 
     @classmethod
-    def parse(cls, content, cwd, file=""):
+    def parse(cls, content, cwd, file="", workers=None):
         parser = cls()
 
-        config = parser.parse_and_register_config(content, cwd, file)
+        config = parser.parse_and_register_config(content, cwd, file, workers)
         parser.root = config
         unhandled_imports = list(config.imports)
 
@@ -90,18 +88,22 @@ class Parser:
                     content = f.read()
 
                 config = parser.parse_and_register_config(
-                    content, imp.path.parent, str(imp.path)
+                    content, imp.path.parent, str(imp.path), workers
                 )
 
                 unhandled_imports.extend(config.imports)
 
-        for config in parser.configs.values():
-            for stack in config.stacks:
-                parser.register_stack(stack)
+        for config_file, config in parser.configs.items():
+            lines = parser.lines.get(config_file, {})
+
+            for stack, line in zip(config.stacks, lines.get("stacks", repeat(None))):
+                parser.register_stack(stack, config_file, line)
 
-            for service in config.services:
+            for service, line in zip(
+                config.services, lines.get("services", repeat(None))
+            ):
                 if hasattr(service, "name"):
-                    parser.register_service(service)
+                    parser.register_service(service, config_file, line)
 
         return parser
 
@@ -139,11 +141,14 @@ class Parser:
                 )
 
     def resolve_template(self, obj):
-        if obj.template not in self.services:
+        template = self.symbols.service(obj.template)
+        if template is None:
+            location = self.symbols.location(SymbolTable.SERVICE, obj.name)
             raise ConfigError(
-                f"Cannot find template '{obj.template}' for service '{obj.name}'"
+                f"Cannot find template '{obj.template}' for service '{obj.name}'",
+                file=location.file,
+                line=location.line,
             )
-        template = self.services[obj.template]
 
         # The way "template" works is
         # 1. Duplicate the referenced template object
@@ -161,18 +166,22 @@ class Parser:
         return new_obj
 
     def resolve_stack(self, obj):
-        if obj.stack not in self.stacks:
+        stack = self.symbols.stack(obj.stack)
+        if stack is None:
             raise ConfigError(f"Cannot find stack with name '{obj.stack}'")
 
-        stack = self.stacks[obj.stack]
         results = []
 
         for name in stack.services:
-            if name not in self.services:
+            service = self.symbols.service(name)
+            if service is None:
+                location = self.symbols.location(SymbolTable.STACK, stack.name)
                 raise ConfigError(
-                    f"Cannot find service '{name}' defined in stack '{stack.name}'"
+                    f"Cannot find service '{name}' defined in stack '{stack.name}'",
+                    file=location.file,
+                    line=location.line,
                 )
-            results.append(self.services[name])
+            results.append(service)
 
         return results
 
@@ -196,7 +205,11 @@ class ConfigFile(
         return [self._parse_stack(item) for item in stacks]
 
     def _transform_services(self, services):
-        return [self._parse_service(item) for item in services]
+        # Services validated by `validate_services` are already parsed.
+        return [
+            item if isinstance(item, ConfigItem) else self._parse_service(item)
+            for item in services
+        ]
 
     @staticmethod
     def _validate_version(version):
@@ -206,16 +219,38 @@ class ConfigFile(
             raise ConfigError(f"Unsupported config version '{version}'")
 
     @classmethod
-    def load(cls, f, cwd):
-        return cls.loads(f.read(), cwd)
+    def load(cls, f, cwd, workers=None):
+        return cls.loads(f.read(), cwd, workers=workers)
+
+    @classmethod
+    def loads(cls, s, cwd, workers=None):
+        """Load a config from string `s`. If `workers` is given, services are
+        validated as a batch (see `validate_services`) on a process pool of
+        that size, and every invalid service is reported at once.
+        """
+        return cls.from_obj(cls.load_obj(s), cwd, workers=workers)
 
     @classmethod
-    def loads(cls, s, cwd):
-        obj = cls._load_obj(s)
-        return cls(**obj, cwd=cwd)
+    def from_obj(cls, obj, cwd, workers=None):
+        if workers is None:
+            return cls(**obj, cwd=cwd)
+
+        services = validate_services(
+            obj.pop("services", None) or [],
+            partial(cls._parse_service_in, cwd=cwd),
+            workers=workers,
+        )
+        return cls(**obj, services=services, cwd=cwd)
+
+    @staticmethod
+    def item_lines(obj):
+        """Return the line numbers of the stacks and services of the loaded
+        config `obj`, so that they can be reported along with their names.
+        """
+        return {key: _sequence_lines(obj.get(key)) for key in ("stacks", "services")}
 
     @staticmethod
-    def _load_obj(s):
+    def load_obj(s):
         return yaml.YAML().load(s) or {}
 
     @staticmethod
@@ -231,11 +266,23 @@ class ConfigFile(
         return ImportItem(path=path)
 
     def _parse_service(self, item):
+        return self._parse_service_in(item, self.cwd)
+
+    @staticmethod
+    def _parse_service_in(item, cwd):
         if "stack" in item:
             return StackServiceItem(stack=item["stack"])
 
         if "handler" in item:
-            item["handler"] = HandlerField(item["handler"], self.cwd)
+            item["handler"] = HandlerField(item["handler"], cwd)
+
+        # Certificates and journal files are relative to the config file too.
+        for field in TLS_FIELDS:
+            if isinstance(item.get(field), str):
+                item[field] = str(cwd.joinpath(item[field]))
+        journal = item.get("journal")
+        if isinstance(journal, dict) and isinstance(journal.get("path"), str):
+            item["journal"] = {**journal, "path": str(cwd.joinpath(journal["path"]))}
 
         if "template" in item and "name" in item:
             item = item.copy()
@@ -250,6 +297,14 @@ class ConfigFile(
         raise ConfigError(f"Unknown service definition:\n{definition}")
 
 
+def _sequence_lines(items):
+    # ruamel records 0-based positions of sequence entries in `lc`.
+    if not hasattr(items, "lc"):
+        return [None] * len(items or ())
+
+    return [items.lc.item(index)[0] + 1 for index in range(len(items))]
+
+
 #################################################
 # Below are the configuration sub-items for each
 # field.
@@ -0,0 +1,103 @@
+"""
+symbols indexes service, template and stack names across all config files.
+"""
+from collections import defaultdict, namedtuple
+
+from .error import ConfigError
+
+__all__ = (
+    "Location",
+    "SymbolTable",
+)
+
+
+Location = namedtuple("Location", "file,line")
+
+
+class SymbolTable:
+    """A single table of every service, template and stack defined in the
+    parsed config files. Services and templates share one namespace since
+    templates are looked up among services.
+
+    Besides O(1) lookups by name, the table remembers where each symbol was
+    defined and which symbols refer to it, so that questions like "which
+    stacks use service X" don't need to scan the configs.
+    """
+
+    SERVICE = "service"
+    STACK = "stack"
+
+    def __init__(self):
+        self.services = {}
+        self.stacks = {}
+        self._locations = {}
+        self._referrers = defaultdict(set)
+
+    def add_service(self, service, file="", line=None):
+        if service.name in self.services:
+            prev = self.location(self.SERVICE, service.name)
+            raise ConfigError(
+                f"Duplicate service name '{service.name}' found",
+                file=file,
+                line=line,
+                previous=_format_location(prev),
+            )
+
+        self.services[service.name] = service
+        self._locations[self.SERVICE, service.name] = Location(file, line)
+
+        template = getattr(service, "template", None)
+        if template is not None:
+            self._referrers[template].add((self.SERVICE, service.name))
+
+    def add_stack(self, stack, file="", line=None):
+        if stack.name in self.stacks:
+            prev = self.stacks[stack.name]
+            if prev.services != stack.services:
+                raise ConfigError(
+                    f"Duplicate stack name '{stack.name}' but different services "
+                    f"list {prev.services} and {stack.services} found",
+                    file=file,
+                    line=line,
+                    previous=_format_location(self.location(self.STACK, stack.name)),
+                )
+            return
+
+        self.stacks[stack.name] = stack
+        self._locations[self.STACK, stack.name] = Location(file, line)
+
+        for name in stack.services:
+            self._referrers[name].add((self.STACK, stack.name))
+
+    def service(self, name):
+        return self.services.get(name)
+
+    def stack(self, name):
+        return self.stacks.get(name)
+
+    def location(self, kind, name):
+        """Return the `Location` where the symbol was defined. Both fields are
+        empty if the symbol was added without one.
+        """
+        return self._locations.get((kind, name), Location("", None))
+
+    def referrers(self, name):
+        """Return (kind, name) pairs of every symbol referring to the service
+        or template `name`.
+        """
+        return sorted(self._referrers.get(name, ()))
+
+    def stacks_using(self, name):
+        return [ref for kind, ref in self.referrers(name) if kind == self.STACK]
+
+    def services_derived_from(self, name):
+        return [ref for kind, ref in self.referrers(name) if kind == self.SERVICE]
+
+
+def _format_location(location):
+    if not location.file:
+        return ""
+    if location.line is None:
+        return location.file
+
+    return f"{location.file}:{location.line}"
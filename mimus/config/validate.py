@@ -0,0 +1,104 @@
+"""
+validate parses and validates service definitions in batches.
+"""
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .error import ConfigError, ConfigErrorGroup
+
+__all__ = (
+    "DEFAULT_CHUNKSIZE",
+    "validate_services",
+)
+
+
+DEFAULT_CHUNKSIZE = 256
+
+
+def validate_services(items, parse, *, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Turn raw service definitions into service items with `parse`, then
+    check the whole batch at once.
+
+    When `workers` is given, chunks of `chunksize` definitions are parsed on a
+    process pool of that size, so `parse` and the definitions must be
+    picklable. Instead of stopping at the first `ConfigError`, every error is
+    collected and raised together as a `ConfigErrorGroup`.
+    """
+    items = [_plain(item) for item in items]
+    chunks = [
+        (start, items[start : start + chunksize])
+        for start in range(0, len(items), chunksize)
+    ]
+
+    if workers and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_parse_chunk, parse, start, chunk)
+                for start, chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [_parse_chunk(parse, start, chunk) for start, chunk in chunks]
+
+    services = []
+    errors = []
+    for chunk_services, chunk_errors in results:
+        services.extend(chunk_services)
+        errors.extend(chunk_errors)
+
+    errors.extend(_check_names(services))
+
+    if errors:
+        errors.sort(key=lambda e: e.meta.item)
+        raise ConfigErrorGroup(errors)
+
+    return [service for _, service in services]
+
+
+def _parse_chunk(parse, start, chunk):
+    services = []
+    errors = []
+    for index, item in enumerate(chunk, start):
+        try:
+            services.append((index, parse(item)))
+        except ConfigError as e:
+            errors.append(ConfigError(e, item=index + 1, name=_name_of(item)))
+
+    return services, errors
+
+
+def _check_names(services):
+    """Report every service name that is defined more than once in the
+    batch, in a single pass over the parsed services.
+    """
+    indices = defaultdict(list)
+    for index, service in services:
+        name = getattr(service, "name", None)
+        if name is not None:
+            indices[name].append(index)
+
+    return [
+        ConfigError(f"Duplicate service name '{name}' found", item=index + 1)
+        for name, found in indices.items()
+        if len(found) > 1
+        for index in islice(found, 1, None)
+    ]
+
+
+def _name_of(item):
+    if isinstance(item, dict):
+        return item.get("name")
+
+    return None
+
+
+def _plain(item):
+    # ruamel containers carry comments and marks around, which only slow
+    # down pickling when handing chunks to the worker processes.
+    if isinstance(item, dict):
+        return {key: _plain(value) for key, value in item.items()}
+    if isinstance(item, list):
+        return [_plain(value) for value in item]
+
+    return item
@@ -0,0 +1,57 @@
+"""
+adapters maps service protocols to the adapters serving them.
+"""
+import socket
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "ProtocolAdapter",
+    "get_adapter",
+    "register_adapter",
+)
+
+
+_adapters = {}
+
+
+class ProtocolAdapter:
+    """Serves the services of one protocol, selected by their `protocol`.
+
+    Adapters are registered with `register_adapter`. The runtime calls
+    `validate` for each service when it is created, and `listen` for each
+    group of services sharing a port when it starts.
+    """
+
+    socket_type = socket.SOCK_STREAM
+
+    def validate(self, service):
+        """Raise a `ConfigError` if `service` cannot be served."""
+
+    async def listen(self, runtime, services, port, sock=None):
+        """Serve `services` on `port`, using the already bound `sock` if
+        given. Return an object with the `close`, `wait_closed` and
+        `serve_forever` methods of `asyncio.Server`.
+        """
+        raise NotImplementedError
+
+
+def register_adapter(name, adapter):
+    """Serve the services with protocol `name` with `adapter`."""
+    _adapters[name] = adapter
+    return adapter
+
+
+def get_adapter(protocol):
+    _load_builtins()
+    try:
+        return _adapters[protocol]
+    except KeyError:
+        raise ConfigError(f"Unsupported protocol '{protocol}'") from None
+
+
+def _load_builtins():
+    # The built-in adapters register themselves when their module is
+    # imported. Their modules import this one, hence the late import.
+    # pylint: disable=import-outside-toplevel,unused-import,cyclic-import
+    from . import raw, server
@@ -0,0 +1,208 @@
+"""
+executor runs blocking handlers off the event loop.
+"""
+import asyncio
+import inspect
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..config.error import ConfigError
+from .handler import load_handler
+
+__all__ = (
+    "ExecutorBusy",
+    "ExecutorMetrics",
+    "HandlerExecutor",
+    "executor_for",
+    "is_async_handler",
+)
+
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 64
+
+
+ExecutorMetrics = namedtuple(
+    "ExecutorMetrics",
+    "submitted,completed,failed,rejected,pending,peak_pending,busy_time",
+)
+
+
+class ExecutorBusy(Exception):
+    """Raised when a call would exceed the queue of an executor."""
+
+
+def is_async_handler(handler):
+    """Return whether calling `handler` returns a coroutine, including for
+    objects with an async `__call__`.
+    """
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+        getattr(handler, "__call__", None)
+    )
+
+
+def executor_for(service, handler, executor=None):
+    """Return the executor running `handler`, the handler of `service`:
+    `executor` or one built from the service. Returns None for coroutine
+    handlers, which run on the event loop.
+    """
+    if handler is None or is_async_handler(handler):
+        return None
+    if executor is None:
+        return HandlerExecutor.from_service(service)
+
+    return executor
+
+
+class HandlerExecutor:
+    """Runs the blocking handler of one service in its own pool, so a slow
+    handler only delays the requests of its service:
+
+        executor: {kind: thread, workers: 4, max_queue: 64, status: 503}
+
+    `kind` is `thread`, `process` or `inline`, to call the handler on the
+    event loop. A process pool imports the handler in the worker processes,
+    so requests and results have to be picklable. At most `workers` calls
+    run at once and `max_queue` more wait for a worker; further calls are
+    rejected with `ExecutorBusy`, answered with `status`.
+
+    The pool is only created on the first call. In `metrics`, `busy_time`
+    is the time workers spent in the handler, without the time calls waited
+    in the queue.
+    """
+
+    def __init__(
+        self,
+        name,
+        kind="thread",
+        workers=DEFAULT_WORKERS,
+        max_queue=DEFAULT_MAX_QUEUE,
+        status=503,
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ConfigError(f"Unknown executor kind '{kind}'", service=name)
+        if not isinstance(workers, int) or workers < 1:
+            raise ConfigError("executor workers should be positive", service=name)
+        if not isinstance(max_queue, int) or max_queue < 0:
+            raise ConfigError("executor max_queue should not be negative", service=name)
+
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self.status = status
+        self._pool = None
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._pending = 0
+        self._peak_pending = 0
+        self._busy_time = 0.0
+
+    @classmethod
+    def from_service(cls, service):
+        config = service.protocol_attrs.get("executor") or {}
+        if isinstance(config, str):
+            config = {"kind": config}
+        if not isinstance(config, dict):
+            raise ConfigError(
+                "executor should be either a kind or a dict", service=service.name
+            )
+
+        try:
+            return cls(service.name, **config)
+        except TypeError as e:
+            raise ConfigError(f"Invalid executor: {e}", service=service.name) from e
+
+    @property
+    def metrics(self):
+        return ExecutorMetrics(
+            submitted=self._submitted,
+            completed=self._completed,
+            failed=self._failed,
+            rejected=self._rejected,
+            pending=self._pending,
+            peak_pending=self._peak_pending,
+            busy_time=self._busy_time,
+        )
+
+    async def run(self, field, handler, request):
+        """Call `handler`, loaded from the `HandlerField` `field`, with
+        `request` and return its result.
+        """
+        if self.kind == "inline":
+            return handler(request)
+
+        if self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise ExecutorBusy(self.name)
+
+        self._submitted += 1
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        try:
+            loop = asyncio.get_event_loop()
+            if self.kind == "process":
+                future = loop.run_in_executor(
+                    self._get_pool(), _call_handler, field, request
+                )
+            else:
+                future = loop.run_in_executor(
+                    self._get_pool(), _timed_call, handler, request
+                )
+            result, error, busy_time = await future
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+
+        self._busy_time += busy_time
+        if error is not None:
+            self._failed += 1
+            raise error
+
+        self._completed += 1
+        return result
+
+    def shutdown(self):
+        if self._pool is not None:
+            # Process pools wait for their workers to exit: the exit of the
+            # interpreter hangs, or raises, when they are left running.
+            self._pool.shutdown(wait=self.kind == "process")
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f"mimus-{self.name}",
+                )
+
+        return self._pool
+
+
+def _call_handler(field, request):
+    # Runs in a worker process, where the handler is imported on first use.
+    return _timed_call(load_handler(field), request)
+
+
+def _timed_call(handler, request):
+    # Runs in a worker, so that the busy time of the pool does not include
+    # the time calls wait in its queue. Errors are returned along with the
+    # time, then raised on the event loop.
+    start = time.perf_counter()
+    try:
+        result, error = handler(request), None
+    except Exception as e:  # pylint: disable=broad-except
+        result, error = None, e
+
+    return result, error, time.perf_counter() - start
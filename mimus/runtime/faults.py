@@ -0,0 +1,164 @@
+"""
+faults simulates latency and errors configured in `protocol_attrs`.
+"""
+import bisect
+import random
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "FaultInjector",
+    "LatencyModel",
+)
+
+
+class LatencyModel:
+    """Samples simulated latencies, in seconds, from a distribution defined
+    in milliseconds:
+
+    - `{distribution: fixed, value: 20}`
+    - `{distribution: uniform, min: 10, max: 30}`
+    - `{distribution: normal, mean: 20, stddev: 5}`
+    - `{distribution: percentiles, percentiles: {50: 12, 99: 80, 100: 250}}`
+
+    Recorded percentiles are interpolated linearly between the given points.
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "percentiles")
+
+    def __init__(self, distribution, rng=None, **params):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ConfigError(f"Unknown latency distribution '{distribution}'")
+
+        self.distribution = distribution
+        self._rng = rng or random.Random()
+
+        try:
+            self.sample = getattr(self, f"_init_{distribution}")(**params)
+        except TypeError as e:
+            raise ConfigError(
+                f"Invalid parameters for latency distribution '{distribution}'"
+            ) from e
+
+    @classmethod
+    def from_attrs(cls, attrs, rng=None):
+        if isinstance(attrs, (int, float)):
+            return cls("fixed", rng=rng, value=attrs)
+        if not isinstance(attrs, dict):
+            raise ConfigError("latency should be either a number or a dict")
+
+        attrs = dict(attrs)
+        return cls(attrs.pop("distribution", "fixed"), rng=rng, **attrs)
+
+    @staticmethod
+    def _init_fixed(value):
+        delay = _seconds(value)
+        return lambda: delay
+
+    def _init_uniform(self, min, max):  # pylint: disable=redefined-builtin
+        low, high = _seconds(min), _seconds(max)
+        uniform = self._rng.uniform
+        return lambda: uniform(low, high)
+
+    def _init_normal(self, mean, stddev):
+        mean, stddev = _seconds(mean), _seconds(stddev)
+        gauss = self._rng.gauss
+        return lambda: max(0.0, gauss(mean, stddev))
+
+    def _init_percentiles(self, percentiles):
+        points = sorted((float(p) / 100, _seconds(v)) for p, v in percentiles.items())
+        if not points or not all(0 <= p <= 1 for p, _ in points):
+            raise ConfigError("latency percentiles should be in the range [0, 100]")
+
+        if points[0][0] > 0:
+            points.insert(0, (0.0, points[0][1]))
+        if points[-1][0] < 1:
+            points.append((1.0, points[-1][1]))
+
+        quantiles = [p for p, _ in points]
+        values = [v for _, v in points]
+        rand = self._rng.random
+
+        def sample():
+            quantile = rand()
+            index = max(1, bisect.bisect_right(quantiles, quantile))
+            if index >= len(quantiles):
+                return values[-1]
+
+            lower, upper = quantiles[index - 1], quantiles[index]
+            low_value, high_value = values[index - 1], values[index]
+            if upper == lower:
+                return high_value
+
+            fraction = (quantile - lower) / (upper - lower)
+            return low_value + (high_value - low_value) * fraction
+
+        return sample
+
+
+class FaultInjector:
+    """Applies the simulated latency and error rate of a service:
+
+        latency: {distribution: normal, mean: 20, stddev: 5}
+        errors: {rate: 0.01, status: 503}
+
+    Delays are awaited on a shared `TimerWheel` instead of one
+    `asyncio.sleep` per request.
+    """
+
+    def __init__(self, latency=None, error_rate=0.0, error_status=503, rng=None):
+        if not 0 <= error_rate <= 1:
+            raise ConfigError("error rate should be in the range [0, 1]")
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = (rng or random.Random()).random
+
+    @classmethod
+    def from_attrs(cls, protocol_attrs, rng=None):
+        """Build an injector from `protocol_attrs`, or return None if the
+        service does not simulate any fault.
+        """
+        latency = protocol_attrs.get("latency")
+        errors = protocol_attrs.get("errors")
+        if latency is None and errors is None:
+            return None
+
+        rng = rng or random.Random(protocol_attrs.get("seed"))
+        if latency is not None:
+            latency = LatencyModel.from_attrs(latency, rng=rng)
+
+        errors = errors or {}
+        if not isinstance(errors, dict):
+            raise ConfigError("errors should be a dict")
+
+        return cls(
+            latency=latency,
+            error_rate=errors.get("rate", 0.0),
+            error_status=errors.get("status", 503),
+            rng=rng,
+        )
+
+    def delay(self):
+        return self.latency.sample() if self.latency is not None else 0.0
+
+    def should_fail(self):
+        return self.error_rate > 0 and self._random() < self.error_rate
+
+    async def apply(self, wheel):
+        """Wait for the simulated latency, then return the error status to
+        respond with, or None if the request should be handled normally.
+        """
+        delay = self.delay()
+        if delay > 0:
+            await wheel.sleep(delay)
+
+        return self.error_status if self.should_fail() else None
+
+
+def _seconds(milliseconds):
+    if not isinstance(milliseconds, (int, float)) or milliseconds < 0:
+        raise ConfigError("latency should be a non-negative number of milliseconds")
+
+    return milliseconds / 1000
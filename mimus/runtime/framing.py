@@ -0,0 +1,169 @@
+"""
+framing splits byte streams into frames without copying them.
+"""
+import functools
+import struct
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "Framer",
+    "FramingError",
+    "LengthPrefixedFramer",
+    "LineFramer",
+    "framer_factory",
+)
+
+
+DEFAULT_MAX_LENGTH = 1 << 20
+
+
+class FramingError(ValueError):
+    pass
+
+
+class Framer:
+    """Splits the data received on a connection into frames.
+
+    Frames are `memoryview` slices of the received data, or of the buffer
+    holding the incomplete frame of the previous call. Data is only copied
+    when a frame spans several calls. A frame is released when the next one
+    is requested, so a consumer that keeps one has to copy it with `bytes`.
+    """
+
+    def __init__(self, max_length=DEFAULT_MAX_LENGTH):
+        self.max_length = max_length
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Yield the frames completed by `data`."""
+        buffer = self._buffer
+        if buffer:
+            buffer += data
+            source = buffer
+        else:
+            source = data
+
+        offset = 0
+        view = memoryview(source)
+        try:
+            while True:
+                span = self._split(source, offset)
+                if span is None:
+                    break
+                start, end, offset = span
+
+                frame = view[start:end]
+                try:
+                    yield frame
+                finally:
+                    frame.release()
+        finally:
+            view.release()
+            if source is buffer:
+                del buffer[:offset]
+            else:
+                buffer += data[offset:]
+
+    def encode(self, payload):
+        """Return the buffers to write for `payload`."""
+        raise NotImplementedError
+
+    def _split(self, source, offset):
+        """Return the start and end of the frame at `offset` and the offset
+        after it, or None if the frame is incomplete.
+        """
+        raise NotImplementedError
+
+
+class LengthPrefixedFramer(Framer):
+    """Frames preceded by their length as an unsigned integer of `size`
+    bytes.
+    """
+
+    FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+    def __init__(self, size=4, byteorder="big", max_length=DEFAULT_MAX_LENGTH):
+        if size not in self.FORMATS:
+            raise ConfigError("Length prefix size should be one of 1, 2, 4 or 8")
+        if byteorder not in ("big", "little"):
+            raise ConfigError("Length prefix byteorder should be big or little")
+
+        super().__init__(max_length)
+        self.size = size
+        self._prefix = struct.Struct(
+            (">" if byteorder == "big" else "<") + self.FORMATS[size]
+        )
+
+    def encode(self, payload):
+        return (self._prefix.pack(len(payload)), payload)
+
+    def _split(self, source, offset):
+        start = offset + self.size
+        if len(source) < start:
+            return None
+
+        (length,) = self._prefix.unpack_from(source, offset)
+        if length > self.max_length:
+            raise FramingError(f"Frame of {length} bytes is too long")
+
+        end = start + length
+        if len(source) < end:
+            return None
+
+        return start, end, end
+
+
+class LineFramer(Framer):
+    """Frames ended by `delimiter`, which is not part of the frame."""
+
+    def __init__(self, delimiter=b"\n", max_length=DEFAULT_MAX_LENGTH):
+        if isinstance(delimiter, str):
+            delimiter = delimiter.encode()
+        if not delimiter:
+            raise ConfigError("Line delimiter should not be empty")
+
+        super().__init__(max_length)
+        self.delimiter = delimiter
+
+    def encode(self, payload):
+        return (payload, self.delimiter)
+
+    def _split(self, source, offset):
+        end = source.find(self.delimiter, offset)
+        if end < 0:
+            if len(source) - offset > self.max_length:
+                raise FramingError("Line is too long")
+            return None
+
+        return offset, end, end + len(self.delimiter)
+
+
+FRAMERS = {
+    "length": LengthPrefixedFramer,
+    "line": LineFramer,
+}
+
+
+def framer_factory(attrs, default="line"):
+    """Return a callable creating the framer configured by the `framing`
+    attribute, e.g. `framing: line` or `framing: {kind: length, size: 2}`.
+    """
+    framing = attrs.get("framing") or default
+    if isinstance(framing, str):
+        framing = {"kind": framing}
+    if not isinstance(framing, dict):
+        raise ConfigError("framing should be either a kind or a dict")
+
+    params = dict(framing)
+    kind = params.pop("kind", default)
+    if kind not in FRAMERS:
+        raise ConfigError(f"Unknown framing '{kind}'")
+
+    factory = functools.partial(FRAMERS[kind], **params)
+    try:
+        factory()
+    except TypeError as e:
+        raise ConfigError(f"Invalid {kind} framing: {e}") from e
+
+    return factory
@@ -0,0 +1,87 @@
+"""
+handler loads the handlers referenced by services.
+"""
+import hashlib
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+from ..config.error import ConfigError
+
+__all__ = ("load_handler",)
+
+
+_cache = {}
+
+
+def load_handler(field):
+    """Import the object referenced by a `HandlerField`. The fully qualified
+    name is `module:attribute`, where the module is looked up in the folder
+    of the config file that defined the handler before `sys.path`.
+
+    Modules found in that folder are imported under a name derived from the
+    folder, so config files in different folders can have handler modules
+    with the same name.
+    """
+    key = (field.fqn, str(field.origin))
+    if key in _cache:
+        return _cache[key]
+
+    module_name, sep, attr = field.fqn.partition(":")
+    if not sep or not module_name or not attr:
+        raise ConfigError(
+            f"handler '{field.fqn}' should be in the form 'module:attribute'"
+        )
+
+    origin = str(field.origin)
+    sys.path.insert(0, origin)
+    try:
+        obj = _import(module_name, Path(origin))
+    except ImportError as e:
+        raise ConfigError(f"Cannot import module of handler '{field.fqn}'") from e
+    finally:
+        sys.path.remove(origin)
+
+    try:
+        for name in attr.split("."):
+            obj = getattr(obj, name)
+    except AttributeError as e:
+        raise ConfigError(f"Cannot find handler '{field.fqn}'") from e
+
+    if not callable(obj):
+        raise ConfigError(f"handler '{field.fqn}' should be callable")
+
+    _cache[key] = obj
+    return obj
+
+
+def _import(module_name, origin):
+    top, _, rest = module_name.partition(".")
+    path = origin / f"{top}.py"
+    search_locations = None
+    if not path.is_file():
+        path = origin / top / "__init__.py"
+        search_locations = [str(path.parent)]
+        if not path.is_file():
+            return importlib.import_module(module_name)
+
+    digest = hashlib.sha1(str(origin).encode()).hexdigest()[:12]
+    unique_name = f"mimus_handlers_{digest}_{top}"
+    module = sys.modules.get(unique_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            unique_name, path, submodule_search_locations=search_locations
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[unique_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[unique_name]
+            raise
+
+    if rest:
+        return importlib.import_module(f"{unique_name}.{rest}")
+
+    return module
@@ -0,0 +1,600 @@
+"""
+http implements HTTP/1.1 with persistent connections and pipelining.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import time
+from collections import deque
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from .streaming import DEFAULT_CHUNK_SIZE, close_body, event_stream, iter_chunks
+
+__all__ = (
+    "FlowControlMixin",
+    "Headers",
+    "HTTPError",
+    "HTTPProtocol",
+    "Request",
+    "Response",
+    "StreamingResponse",
+    "call_app",
+)
+
+
+logger = logging.getLogger(__name__)
+
+MAX_HEAD_SIZE = 64 * 1024
+MAX_PIPELINE = 64
+KEEP_ALIVE_TIMEOUT = 75
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class HTTPError(Exception):
+    def __init__(self, status, reason=""):
+        self.status = status
+
+        super().__init__(reason or HTTPStatus(status).phrase)
+
+
+class Headers:
+    """Request headers as a list of `(name, value)` byte strings with
+    lower-cased names. Nothing is decoded unless it is asked for, and lookups
+    scan the list instead of building a dict per request.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw=()):
+        self.raw = list(raw)
+
+    @classmethod
+    def parse(cls, lines):
+        raw = []
+        for line in lines:
+            name, sep, value = line.partition(b":")
+            if not sep or not name or name[-1:] in (b" ", b"\t"):
+                raise HTTPError(400, "Malformed header")
+            raw.append((name.lower(), value.strip()))
+
+        return cls(raw)
+
+    def get(self, name, default=None):
+        name = name.lower().encode("latin-1") if isinstance(name, str) else name
+        for key, value in self.raw:
+            if key == name:
+                return value.decode("latin-1")
+
+        return default
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return len(self.raw)
+
+    def items(self):
+        return [(k.decode("latin-1"), v.decode("latin-1")) for k, v in self.raw]
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class Request:
+    """An HTTP request. `params` and `json()` are parsed on first use."""
+
+    __slots__ = ("method", "target", "path", "query", "version", "headers", "body")
+
+    def __init__(self, method, target, version="1.1", headers=None, body=b""):
+        self.method = method
+        self.target = target
+        self.path, _, self.query = target.partition("?")
+        self.version = version
+        self.headers = headers if headers is not None else Headers()
+        self.body = body
+
+    @property
+    def host(self):
+        host = self.headers.get(b"host") or self.headers.get(b":authority") or ""
+        if host.startswith("["):
+            return host[: host.find("]") + 1]
+
+        return host.rpartition(":")[0] if ":" in host else host
+
+    @property
+    def params(self):
+        return {k: v[0] for k, v in parse_qs(self.query).items()}
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+    @property
+    def keep_alive(self):
+        connection = (self.headers.get(b"connection") or "").lower()
+        if self.version == "1.0":
+            return "keep-alive" in connection
+
+        return "close" not in connection
+
+    def context(self, names):
+        """Return the request fields in `names` as a mapping for response
+        templates.
+        """
+        context = {}
+        for name in names:
+            if name == "params":
+                context[name] = self.params
+            elif name == "headers":
+                context[name] = self.headers.to_dict()
+            elif name == "body":
+                try:
+                    context[name] = self.json()
+                except ValueError:
+                    context[name] = self.body.decode("utf-8", "replace")
+            elif name in ("method", "path", "query"):
+                context[name] = getattr(self, name)
+
+        return context
+
+
+class Response:
+    """An HTTP response with a complete body."""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status=200, headers=None, body=b""):
+        self.status = status
+        self.headers = dict(headers or {})
+        self.body = body
+
+    @classmethod
+    def from_result(cls, result):
+        """Build a response from what a handler returns: a `Response`, a
+        body as bytes or str, a generator, async generator or binary file
+        streamed as the body, a JSON serializable object, or None.
+        """
+        if isinstance(result, Response):
+            return result
+        if result is None:
+            return cls(204)
+        if (
+            inspect.isgenerator(result)
+            or inspect.isasyncgen(result)
+            or hasattr(result, "read")
+        ):
+            return StreamingResponse(result)
+        if isinstance(result, (bytes, bytearray, memoryview)):
+            return cls(body=bytes(result))
+        if isinstance(result, str):
+            return cls(
+                headers={"content-type": "text/plain; charset=utf-8"},
+                body=result.encode(),
+            )
+
+        return cls(
+            headers={"content-type": "application/json"},
+            body=json.dumps(result).encode(),
+        )
+
+    def encode_head(self, keep_alive, version="1.1"):
+        framing = None
+        if "content-length" not in self.headers and _has_body(self.status):
+            framing = f"content-length: {len(self.body)}"
+
+        return self._encode_head(keep_alive, framing, version)
+
+    def _encode_head(self, keep_alive, framing, version):
+        lines = [f"HTTP/1.1 {self.status} {_reason(self.status)}", _date()]
+        for name, value in self.headers.items():
+            lines.append(f"{name}: {value}")
+
+        if framing:
+            lines.append(framing)
+        if not keep_alive:
+            lines.append("connection: close")
+        elif version == "1.0":
+            # HTTP/1.0 connections are only persistent if both sides say so.
+            lines.append("connection: keep-alive")
+
+        lines.append("\r\n")
+        return "\r\n".join(lines).encode("latin-1")
+
+
+class StreamingResponse(Response):
+    """A response whose body is produced while it is sent, from an iterable
+    or async iterable of chunks, or a binary file-like object (see
+    `iter_chunks`).
+
+    The body is sent with chunked encoding, unless the headers have a
+    content-length. Chunks are only produced as fast as the client reads
+    them, so memory use does not depend on the size of the body.
+
+    The protocols `close` the response once the body is sent or abandoned,
+    which runs the callbacks added with `add_close_callback`.
+    """
+
+    __slots__ = ("chunk_size", "_close_callbacks", "_streamed")
+
+    def __init__(self, body, status=200, headers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(status, headers, body)
+        self.chunk_size = chunk_size
+        self._close_callbacks = []
+        self._streamed = False
+
+    @classmethod
+    def event_stream(cls, events, headers=None):
+        """Stream `events` as server-sent events (see `encode_event`)."""
+        headers = {
+            "content-type": "text/event-stream",
+            "cache-control": "no-cache",
+            **(headers or {}),
+        }
+        return cls(event_stream(events), headers=headers)
+
+    @property
+    def chunked(self):
+        return "content-length" not in self.headers and _has_body(self.status)
+
+    def encode_head(self, keep_alive, version="1.1"):
+        # HTTP/1.0 has no chunked encoding, the end of a body of unknown
+        # length is marked by closing the connection.
+        framing = None
+        if self.chunked and version != "1.0":
+            framing = "transfer-encoding: chunked"
+
+        return self._encode_head(keep_alive, framing, version)
+
+    def add_close_callback(self, callback):
+        """Call `callback()` when the response is closed."""
+        self._close_callbacks.append(callback)
+
+    def chunks(self):
+        """Return the chunks of the body, which is closed once they are
+        iterated.
+        """
+        self._streamed = True
+        return iter_chunks(self.body, self.chunk_size)
+
+    async def close(self):
+        callbacks, self._close_callbacks = self._close_callbacks, []
+        try:
+            if not self._streamed:
+                await close_body(self.body)
+        finally:
+            for callback in callbacks:
+                callback()
+
+
+async def call_app(app, request):
+    """Return the response of `app` to `request`, or a 500 response if it
+    raises.
+    """
+    try:
+        return await app(request)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Error while handling %s", request.target)
+        return Response(500)
+
+
+class FlowControlMixin:
+    """Lets a protocol wait in `drain` until the write buffer of its
+    transport is below its high-water mark. `_init_flow_control` has to be
+    called from `connection_made`.
+    """
+
+    _writable = None
+
+    def _init_flow_control(self):
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def pause_writing(self):
+        self._writable.clear()
+
+    def resume_writing(self):
+        self._writable.set()
+
+    async def drain(self):
+        """Wait until the transport buffer is below its high-water mark."""
+        await self._writable.wait()
+
+
+class HTTPProtocol(FlowControlMixin, asyncio.Protocol):
+    """Serves HTTP/1.1 on a connection.
+
+    Connections are persistent unless the client asks otherwise. Pipelined
+    requests are parsed as soon as they arrive and answered in order, one at
+    a time. Reading is paused while too many requests are queued or while
+    the transport buffer is full.
+
+    `app` is a coroutine function taking a `Request` and returning a
+    `Response`. If `http2` is set, a connection starting with the HTTP/2
+    preface (h2c with prior knowledge) is handed over to `HTTP2Protocol`.
+    """
+
+    def __init__(self, app, http2=False, keep_alive_timeout=KEEP_ALIVE_TIMEOUT):
+        self.app = app
+        self.http2 = http2
+        self.keep_alive_timeout = keep_alive_timeout
+
+        self.transport = None
+        self._loop = None
+        self._buffer = bytearray()
+        self._head = None
+        self._queue = deque()
+        self._task = None
+        self._closing = False
+        self._paused = False
+        self._last_active = 0.0
+        self._idle_handle = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._loop = asyncio.get_event_loop()
+        self._init_flow_control()
+        self._touch()
+        self._idle_handle = self._loop.call_later(
+            self.keep_alive_timeout, self._check_idle
+        )
+
+        ssl_object = transport.get_extra_info("ssl_object")
+        if self.http2 and ssl_object and ssl_object.selected_alpn_protocol() == "h2":
+            self._switch_to_http2(b"")
+
+    def connection_lost(self, exc):
+        self._closing = True
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        if self._task is not None:
+            self._task.cancel()
+        self.resume_writing()
+
+    def data_received(self, data):
+        self._touch()
+        self._buffer += data
+
+        if self.http2 and self._head is None and not self._queue:
+            if self._buffer.startswith(H2_PREFACE[: len(self._buffer)]):
+                if len(self._buffer) >= len(H2_PREFACE):
+                    self._switch_to_http2(bytes(self._buffer))
+                return
+
+        try:
+            self._parse()
+        except HTTPError as e:
+            self._closing = True
+            self._queue.append(e)
+
+        if self._queue and self._task is None:
+            self._task = self._loop.create_task(self._process())
+
+        if len(self._queue) >= MAX_PIPELINE and not self._paused:
+            self._paused = True
+            self.transport.pause_reading()
+
+    def _parse(self):
+        while not self._closing:
+            if self._head is None:
+                end = self._buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(self._buffer) > MAX_HEAD_SIZE:
+                        raise HTTPError(431)
+                    return
+
+                self._head = self._parse_head(bytes(self._buffer[:end]))
+                del self._buffer[: end + 4]
+
+            request, length = self._head
+            if length is None:
+                body = self._read_chunked()
+                if body is None:
+                    return
+            else:
+                if len(self._buffer) < length:
+                    return
+                body = bytes(self._buffer[:length])
+                del self._buffer[:length]
+
+            request.body = body
+            self._head = None
+            self._queue.append(request)
+
+            if not request.keep_alive:
+                self._closing = True
+
+    @staticmethod
+    def _parse_head(head):
+        lines = head.split(b"\r\n")
+        try:
+            method, target, version = lines[0].decode("latin-1").split(" ")
+        except ValueError as e:
+            raise HTTPError(400, "Malformed request line") from e
+
+        if version not in ("HTTP/1.1", "HTTP/1.0"):
+            raise HTTPError(505)
+
+        headers = Headers.parse(lines[1:])
+        request = Request(method, target, version[5:], headers)
+
+        if "chunked" in (headers.get(b"transfer-encoding") or "").lower():
+            return request, None
+
+        try:
+            length = int(headers.get(b"content-length") or 0)
+        except ValueError as e:
+            raise HTTPError(400, "Invalid content-length") from e
+        if length < 0:
+            raise HTTPError(400, "Invalid content-length")
+
+        return request, length
+
+    def _read_chunked(self):
+        """Decode a chunked body if it has been received completely."""
+        buffer = self._buffer
+        body = bytearray()
+        pos = 0
+        while True:
+            end = buffer.find(b"\r\n", pos)
+            if end < 0:
+                return None
+
+            try:
+                size = int(bytes(buffer[pos:end]).split(b";")[0], 16)
+            except ValueError as e:
+                raise HTTPError(400, "Invalid chunk size") from e
+
+            if size == 0:
+                trailer_end = buffer.find(b"\r\n\r\n", end)
+                if trailer_end < 0:
+                    return None
+
+                del buffer[: trailer_end + 4]
+                return bytes(body)
+
+            start = end + 2
+            if len(buffer) < start + size + 2:
+                return None
+
+            body += buffer[start : start + size]
+            pos = start + size + 2
+
+    async def _process(self):
+        try:
+            while self._queue:
+                request = self._queue.popleft()
+
+                if self._paused and len(self._queue) < MAX_PIPELINE // 2:
+                    self._paused = False
+                    self.transport.resume_reading()
+
+                if isinstance(request, HTTPError):
+                    response = Response(request.status, body=str(request).encode())
+                    self._write(response, keep_alive=False)
+                    break
+
+                response = await call_app(self.app, request)
+                keep_alive = request.keep_alive
+                await self.send(request, response, keep_alive)
+                if not keep_alive:
+                    break
+                self._touch()
+            else:
+                return
+
+            self.transport.close()
+        finally:
+            self._task = None
+
+    async def send(self, request, response, keep_alive):
+        if isinstance(response, StreamingResponse):
+            await self._send_stream(request, response, keep_alive)
+            return
+
+        self._write(
+            response,
+            keep_alive,
+            head_only=request.method == "HEAD",
+            version=request.version,
+        )
+        await self.drain()
+
+    async def _send_stream(self, request, response, keep_alive):
+        if request.method == "HEAD":
+            self.transport.write(response.encode_head(keep_alive, request.version))
+            await response.close()
+            return
+
+        chunked = response.chunked and request.version != "1.0"
+        if response.chunked and not chunked:
+            keep_alive = False
+            self._closing = True
+        self.transport.write(response.encode_head(keep_alive, request.version))
+
+        chunks = response.chunks()
+        try:
+            async for chunk in chunks:
+                if self.transport.is_closing():
+                    return
+                if not chunk:
+                    continue
+                if chunked:
+                    self.transport.writelines((b"%x\r\n" % len(chunk), chunk, b"\r\n"))
+                else:
+                    self.transport.write(chunk)
+                await self.drain()
+        except Exception:  # pylint: disable=broad-except
+            # The status line is already sent, so the client can only learn
+            # about the error from the connection being closed.
+            logger.exception("Error while streaming %s", request.target)
+            self._closing = True
+            self.transport.close()
+            return
+        finally:
+            await chunks.aclose()
+            await response.close()
+
+        if chunked:
+            self.transport.write(b"0\r\n\r\n")
+
+    def _write(self, response, keep_alive, head_only=False, version="1.1"):
+        head = response.encode_head(keep_alive, version)
+        if head_only or not response.body:
+            self.transport.write(head)
+        elif len(response.body) < 16 * 1024:
+            self.transport.write(head + response.body)
+        else:
+            self.transport.writelines((head, response.body))
+
+    def _touch(self):
+        self._last_active = self._loop.time()
+
+    def _check_idle(self):
+        idle = self._loop.time() - self._last_active
+        if idle >= self.keep_alive_timeout and self._task is None:
+            self.transport.close()
+            return
+
+        self._idle_handle = self._loop.call_later(
+            max(self.keep_alive_timeout - idle, 1), self._check_idle
+        )
+
+    def _switch_to_http2(self, data):
+        # Imported here since h2 is an optional dependency.
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .http2 import HTTP2Protocol
+
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+
+        protocol = HTTP2Protocol(self.app)
+        self.transport.set_protocol(protocol)
+        protocol.connection_made(self.transport)
+        if data:
+            protocol.data_received(data)
+
+
+def _reason(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+def _has_body(status):
+    return status >= 200 and status not in (204, 304)
+
+
+_date_cache = [0, ""]
+
+
+def _date():
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache[0] = now
+        _date_cache[1] = "date: " + formatdate(now, usegmt=True)
+
+    return _date_cache[1]
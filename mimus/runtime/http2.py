@@ -0,0 +1,205 @@
+"""
+http2 implements HTTP/2 on top of the optional `h2` package.
+"""
+import asyncio
+import logging
+
+from .http import FlowControlMixin, Headers, Request, StreamingResponse, call_app
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+except ImportError:  # pragma: no cover
+    h2 = None  # pylint: disable=invalid-name
+
+__all__ = (
+    "HTTP2Protocol",
+    "available",
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def available():
+    return h2 is not None
+
+
+class HTTP2Protocol(FlowControlMixin, asyncio.Protocol):
+    """Serves HTTP/2 on a connection, either h2c with prior knowledge or h2
+    negotiated with ALPN. Streams are handled concurrently, and response
+    bodies are sent as the flow control windows allow.
+    """
+
+    def __init__(self, app):
+        if h2 is None:
+            raise RuntimeError("HTTP/2 support requires the 'h2' package")
+
+        self.app = app
+        self.transport = None
+        self._conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding=None)
+        )
+        self._streams = {}
+        self._tasks = set()
+        self._window_updated = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._window_updated = asyncio.Event()
+        self._init_flow_control()
+        self._conn.initiate_connection()
+        self._flush()
+
+    def connection_lost(self, exc):
+        for task in self._tasks:
+            task.cancel()
+        self._window_updated.set()
+        self.resume_writing()
+
+    def data_received(self, data):
+        try:
+            events = self._conn.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self._flush()
+            self.transport.close()
+            return
+
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                self._streams[event.stream_id] = (event.headers, bytearray())
+            elif isinstance(event, h2.events.DataReceived):
+                stream = self._streams.get(event.stream_id)
+                if stream is not None:
+                    stream[1].extend(event.data)
+                self._conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+            elif isinstance(event, h2.events.StreamEnded):
+                self._dispatch(event.stream_id)
+            elif isinstance(event, h2.events.StreamReset):
+                self._streams.pop(event.stream_id, None)
+            elif isinstance(event, h2.events.WindowUpdated):
+                self._window_updated.set()
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+
+        self._flush()
+
+    def _dispatch(self, stream_id):
+        if stream_id not in self._streams:
+            return
+
+        raw_headers, body = self._streams.pop(stream_id)
+        pseudo = {}
+        headers = []
+        for name, value in raw_headers:
+            if name.startswith(b":"):
+                pseudo[name] = value.decode("latin-1")
+            else:
+                headers.append((name, value))
+        if b":authority" in pseudo:
+            headers.append((b"host", pseudo[b":authority"].encode("latin-1")))
+
+        request = Request(
+            pseudo.get(b":method", "GET"),
+            pseudo.get(b":path", "/"),
+            "2",
+            Headers(headers),
+            bytes(body),
+        )
+
+        task = asyncio.get_event_loop().create_task(self._handle(stream_id, request))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, stream_id, request):
+        response = await call_app(self.app, request)
+        await self.send(stream_id, request, response)
+
+    async def send(self, stream_id, request, response):
+        if isinstance(response, StreamingResponse):
+            await self._send_stream(stream_id, request, response)
+            return
+
+        body = b"" if request.method == "HEAD" else response.body
+
+        headers = [(":status", str(response.status))]
+        headers.extend((k, str(v)) for k, v in response.headers.items())
+        if "content-length" not in response.headers:
+            headers.append(("content-length", str(len(response.body))))
+
+        try:
+            self._conn.send_headers(stream_id, headers, end_stream=not body)
+            self._flush()
+            if body:
+                await self.send_data(stream_id, body, end_stream=True)
+        except h2.exceptions.StreamClosedError:
+            pass
+
+    async def _send_stream(self, stream_id, request, response):
+        headers = [(":status", str(response.status))]
+        headers.extend((k, str(v)) for k, v in response.headers.items())
+
+        if request.method == "HEAD":
+            await response.close()
+            try:
+                self._conn.send_headers(stream_id, headers, end_stream=True)
+                self._flush()
+            except h2.exceptions.StreamClosedError:
+                pass
+            return
+
+        chunks = None
+        try:
+            self._conn.send_headers(stream_id, headers)
+            self._flush()
+            chunks = response.chunks()
+            async for chunk in chunks:
+                if self.transport.is_closing():
+                    return
+                if chunk:
+                    await self.send_data(stream_id, chunk)
+            await self.send_data(stream_id, b"", end_stream=True)
+        except h2.exceptions.StreamClosedError:
+            pass
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Error while streaming %s", request.target)
+            self._conn.reset_stream(stream_id, h2.errors.ErrorCodes.INTERNAL_ERROR)
+            self._flush()
+        finally:
+            if chunks is not None:
+                await chunks.aclose()
+            await response.close()
+
+    async def send_data(self, stream_id, data, end_stream=False):
+        """Send `data` on a stream, waiting for the flow control windows and
+        the transport buffer as needed.
+        """
+        view = memoryview(data)
+        while view:
+            window = self._conn.local_flow_control_window(stream_id)
+            size = min(window, self._conn.max_outbound_frame_size, len(view))
+            if self.transport.is_closing():
+                return
+            if size <= 0:
+                self._window_updated.clear()
+                await self._window_updated.wait()
+                continue
+
+            self._conn.send_data(stream_id, view[:size].tobytes())
+            self._flush()
+            view = view[size:]
+            await self.drain()
+
+        if end_stream:
+            self._conn.end_stream(stream_id)
+            self._flush()
+
+    def _flush(self):
+        data = self._conn.data_to_send()
+        if data:
+            self.transport.write(data)
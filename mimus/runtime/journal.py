@@ -0,0 +1,225 @@
+"""
+journal records the requests received by services.
+"""
+import fnmatch
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "JournalRecord",
+    "JournalWriter",
+    "RequestJournal",
+)
+
+
+DEFAULT_SIZE = 1024
+DEFAULT_MAX_BODY = 64 * 1024
+
+
+JournalRecord = namedtuple("JournalRecord", "time,method,target,headers,body,status")
+
+
+class RequestJournal:
+    """The last `size` requests of a service, in a ring buffer preallocated
+    when the service starts:
+
+        journal: {size: 1024, max_body: 65536, path: requests.jsonl}
+
+    `journal: true` or `journal: <size>` are short forms. Recording a request
+    stores one record in the next slot, overwriting the oldest one, so its
+    cost does not depend on how many requests were recorded before. Bodies
+    are kept by reference, truncated to `max_body` bytes.
+
+    With `path`, relative to the folder of the config file, records are also
+    appended to that file as JSON lines by a `JournalWriter`.
+    """
+
+    def __init__(self, name, size=DEFAULT_SIZE, max_body=DEFAULT_MAX_BODY, path=None):
+        if not isinstance(size, int) or size < 1:
+            raise ConfigError("journal size should be positive", service=name)
+
+        self.name = name
+        self.size = size
+        self.max_body = max_body
+        self.writer = None
+        if path:
+            try:
+                self.writer = JournalWriter(path, name)
+            except OSError as e:
+                raise ConfigError(f"Cannot open journal '{path}'", service=name) from e
+        self._records = [None] * size
+        self._count = 0
+
+    @classmethod
+    def from_service(cls, service):
+        """Build the journal of `service`, or return None if it has none."""
+        config = service.protocol_attrs.get("journal")
+        if config is None or config is False:
+            return None
+        if config is True:
+            config = {}
+        elif isinstance(config, int):
+            config = {"size": config}
+        if not isinstance(config, dict):
+            raise ConfigError(
+                "journal should be either a boolean, a size or a dict",
+                service=service.name,
+            )
+
+        try:
+            return cls(service.name, **config)
+        except TypeError as e:
+            raise ConfigError(f"Invalid journal: {e}", service=service.name) from e
+
+    @property
+    def count(self):
+        """The number of requests recorded since the journal was created."""
+        return self._count
+
+    @property
+    def dropped(self):
+        """The number of records overwritten by newer ones."""
+        return max(self._count - self.size, 0)
+
+    def record(self, request, status):
+        record = JournalRecord(
+            time.time(),
+            request.method,
+            request.target,
+            request.headers,
+            request.body[: self.max_body],
+            status,
+        )
+        self._records[self._count % self.size] = record
+        self._count += 1
+
+        if self.writer is not None:
+            self.writer.append(record)
+
+    def requests(self, method=None, path=None, status=None):
+        """Return the recorded requests, oldest first, with `method`, a path
+        matching the glob pattern `path` and `status`, if given.
+        """
+        records = list(self)
+        if method is not None:
+            method = method.upper()
+            records = [record for record in records if record.method == method]
+        if path is not None:
+            records = [
+                record
+                for record in records
+                if fnmatch.fnmatchcase(record.target.partition("?")[0], path)
+            ]
+        if status is not None:
+            records = [record for record in records if record.status == status]
+
+        return records
+
+    def last(self):
+        if not self._count:
+            return None
+
+        return self._records[(self._count - 1) % self.size]
+
+    def clear(self):
+        self._records = [None] * self.size
+        self._count = 0
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    def __iter__(self):
+        start = self._count - len(self)
+        for index in range(start, self._count):
+            yield self._records[index % self.size]
+
+
+class JournalWriter:
+    """Appends journal records to `path` as JSON lines from a background
+    thread, so requests never wait for the disk.
+
+    Records are queued and written in batches every `interval` seconds, or
+    as soon as `batch_size` are queued. When more than `max_pending` records
+    are queued, new ones are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, path, name="", batch_size=256, interval=0.1, max_pending=65536):
+        self.path = path
+        self.name = name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.dropped = 0
+
+        # deque.append and popleft are thread-safe, so the event loop never
+        # takes a lock to queue a record.
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._file = open(path, "ab")
+        self._thread = threading.Thread(
+            target=self._run, name=f"mimus-journal-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, record):
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def close(self):
+        """Write the queued records and close the file."""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._flush()
+            if self._closed:
+                self._flush()
+                return
+
+    def _flush(self):
+        pending = self._pending
+        lines = []
+        while pending:
+            lines.append(self._encode(pending.popleft()))
+
+        if lines:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+
+    def _encode(self, record):
+        return (
+            json.dumps(
+                {
+                    "service": self.name,
+                    "time": record.time,
+                    "method": record.method,
+                    "target": record.target,
+                    "headers": record.headers.items(),
+                    "body": record.body.decode("utf-8", "backslashreplace"),
+                    "status": record.status,
+                }
+            ).encode()
+            + b"\n"
+        )
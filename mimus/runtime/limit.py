@@ -0,0 +1,214 @@
+"""
+limit enforces per-service rate limits and concurrency caps.
+"""
+import mmap
+import multiprocessing
+import time
+from array import array
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "ConcurrencyLimit",
+    "ServiceLimits",
+    "SharedLimitStore",
+    "TokenBucket",
+)
+
+
+# tokens, time of the last refill, requests in flight
+_SLOT_FIELDS = 3
+_SLOT_SIZE = _SLOT_FIELDS * 8
+_TOKENS, _STAMP, _INFLIGHT = range(_SLOT_FIELDS)
+
+
+class SharedLimitStore:
+    """Limit counters in an anonymous shared memory mapping, one slot per
+    service. The store has to be created before worker processes are
+    forked, so that they all map the same pages.
+
+    Python has no atomic compare-and-swap, so updates are done under one
+    process-shared lock. The critical section is a handful of float
+    operations.
+    """
+
+    def __init__(self, names):
+        self.names = {name: index for index, name in enumerate(names)}
+        self.lock = multiprocessing.Lock()
+        self._mmap = mmap.mmap(-1, max(len(self.names), 1) * _SLOT_SIZE)
+        self._values = memoryview(self._mmap).cast("d")
+
+        for index in range(len(self.names)):
+            self._values[index * _SLOT_FIELDS + _TOKENS] = -1.0
+
+    def slot(self, name):
+        index = self.names[name] * _SLOT_FIELDS
+        return self._values[index : index + _SLOT_FIELDS]
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average and bursts of up to
+    `burst` requests.
+    """
+
+    def __init__(self, rate, burst=None, state=None, lock=None):
+        if rate <= 0:
+            raise ConfigError("rate limit should be positive")
+
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._state = state if state is not None else _local_slot()
+        self._lock = lock
+
+        # A new shared slot is marked with -1 tokens and filled by whichever
+        # process uses it first.
+        if self._state[_TOKENS] < 0:
+            self._state[_TOKENS] = self.burst
+            self._state[_STAMP] = time.monotonic()
+
+    def acquire(self):
+        if self._lock is None:
+            return self._acquire(time.monotonic())
+
+        with self._lock:
+            return self._acquire(time.monotonic())
+
+    def _acquire(self, now):
+        state = self._state
+        tokens = state[_TOKENS] + (now - state[_STAMP]) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        state[_STAMP] = now
+
+        if tokens < 1:
+            state[_TOKENS] = tokens
+            return False
+
+        state[_TOKENS] = tokens - 1
+        return True
+
+    @property
+    def retry_after(self):
+        return max(1, round(1 / self.rate))
+
+
+class ConcurrencyLimit:
+    """Allows at most `limit` requests in flight at once."""
+
+    def __init__(self, limit, state=None, lock=None):
+        if limit <= 0:
+            raise ConfigError("max concurrency should be positive")
+
+        self.limit = limit
+        self._state = state if state is not None else _local_slot()
+        self._lock = lock
+
+    def acquire(self):
+        if self._lock is None:
+            return self._acquire()
+
+        with self._lock:
+            return self._acquire()
+
+    def _acquire(self):
+        if self._state[_INFLIGHT] >= self.limit:
+            return False
+
+        self._state[_INFLIGHT] += 1
+        return True
+
+    def release(self):
+        if self._lock is None:
+            self._state[_INFLIGHT] -= 1
+            return
+
+        with self._lock:
+            self._state[_INFLIGHT] -= 1
+
+    @property
+    def inflight(self):
+        return int(self._state[_INFLIGHT])
+
+
+class ServiceLimits:
+    """The rate limit and concurrency cap of a service:
+
+        rate_limit: {rate: 100, burst: 20, status: 429}
+        max_concurrency: {limit: 10, status: 503}
+
+    `rate_limit` and `max_concurrency` may also be plain numbers. Without a
+    `SharedLimitStore`, counters are local to the process and need no lock
+    since the event loop runs in a single thread.
+    """
+
+    def __init__(self, bucket=None, concurrency=None, rate_status=429, busy_status=503):
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.rate_status = rate_status
+        self.busy_status = busy_status
+
+    @classmethod
+    def from_service(cls, service, store=None):
+        """Build the limits of `service`, or return None if it has none."""
+        attrs = service.protocol_attrs
+        rate_limit = _normalize(attrs.get("rate_limit"), "rate", service)
+        max_concurrency = _normalize(attrs.get("max_concurrency"), "limit", service)
+        if rate_limit is None and max_concurrency is None:
+            return None
+
+        state, lock = None, None
+        if store is not None:
+            state, lock = store.slot(service.name), store.lock
+
+        bucket, concurrency = None, None
+        try:
+            if rate_limit is not None:
+                bucket = TokenBucket(
+                    rate_limit.get("rate", 0), rate_limit.get("burst"), state, lock
+                )
+            if max_concurrency is not None:
+                concurrency = ConcurrencyLimit(
+                    max_concurrency.get("limit", 0), state, lock
+                )
+        except ConfigError as e:
+            raise ConfigError(e, service=service.name) from e
+
+        return cls(
+            bucket,
+            concurrency,
+            rate_status=(rate_limit or {}).get("status", 429),
+            busy_status=(max_concurrency or {}).get("status", 503),
+        )
+
+    def enter(self):
+        """Return None if the request may proceed, in which case `exit` has
+        to be called when it is done, or the status to reject it with.
+        """
+        if self.bucket is not None and not self.bucket.acquire():
+            return self.rate_status
+        if self.concurrency is not None and not self.concurrency.acquire():
+            return self.busy_status
+
+        return None
+
+    def exit(self):
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+
+def _local_slot():
+    return array("d", [-1.0, 0.0, 0.0])
+
+
+def _normalize(value, field, service):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {field: value}
+    if isinstance(value, dict):
+        return value
+
+    raise ConfigError(
+        f"limit should be either a number or a dict with '{field}'",
+        service=service.name,
+    )
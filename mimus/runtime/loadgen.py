@@ -0,0 +1,203 @@
+"""
+loadgen drives services with HTTP/1.1 requests and measures them.
+"""
+import asyncio
+import math
+import re
+import ssl
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+__all__ = (
+    "BenchResult",
+    "build_request",
+    "run_load",
+    "summarize",
+)
+
+
+# Seconds a request sent just before the end of a run has to be answered.
+RESPONSE_GRACE = 1.0
+
+
+BenchResult = namedtuple(
+    "BenchResult", "requests,errors,elapsed,rps,p50,p99,p999,cpu_per_request"
+)
+
+
+def build_request(service, host="127.0.0.1"):
+    """Build a request matching `service`: its method, a path matching its
+    glob pattern and its host.
+    """
+    attrs = service.protocol_attrs
+    method = (attrs.get("method") or "GET").upper()
+    path = re.sub(r"\[[^\]]*\]", "x", attrs.get("path") or "/")
+    path = path.replace("*", "x").replace("?", "x")
+    host = service.host or host
+
+    return (
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: 0\r\n\r\n"
+    ).encode("latin-1")
+
+
+def run_load(host, port, request, duration, connections=16, processes=1, tls=False):
+    """Send `request` over `connections` persistent connections in each of
+    `processes` processes for `duration` seconds. With `processes=0` the load
+    is generated in the calling thread instead. With `tls`, connections use
+    TLS without verifying the certificates of the mock services.
+
+    Returns the latencies of successful (2xx and 3xx) requests in seconds,
+    the number of errors, including other statuses, and the elapsed time.
+    """
+    args = (host, port, request, duration, connections, tls)
+    if processes == 0:
+        results = [_drive_in_process(*args)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(_drive_in_process, *args) for _ in range(processes)
+            ]
+            results = [future.result() for future in futures]
+
+    return _merge(results)
+
+
+def _merge(results):
+    latencies = array("d")
+    errors = 0
+    elapsed = 0.0
+    for result_latencies, result_errors, result_elapsed in results:
+        latencies.extend(result_latencies)
+        errors += result_errors
+        elapsed = max(elapsed, result_elapsed)
+
+    return latencies, errors, elapsed
+
+
+def summarize(latencies, errors, elapsed, cpu=0.0):
+    """Summarize a run. `cpu` is the CPU time the server spent during the
+    run, in seconds.
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+
+    return BenchResult(
+        requests=count,
+        errors=errors,
+        elapsed=elapsed,
+        rps=count / elapsed if elapsed else 0.0,
+        p50=_percentile(ordered, 50),
+        p99=_percentile(ordered, 99),
+        p999=_percentile(ordered, 99.9),
+        cpu_per_request=cpu / count if count else 0.0,
+    )
+
+
+def _percentile(ordered, percent):
+    if not ordered:
+        return 0.0
+
+    # Round first so that e.g. 99.9% of 1000 is rank 999, not 1000.
+    rank = math.ceil(round(percent * len(ordered) / 100, 6))
+    return ordered[max(rank, 1) - 1]
+
+
+def _drive_in_process(host, port, request, duration, connections, tls):
+    context = None
+    if tls:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    return asyncio.run(_drive(host, port, request, duration, connections, context))
+
+
+async def _drive(host, port, request, duration, connections, context):
+    latencies = array("d")
+    errors = [0]
+    start = time.perf_counter()
+    deadline = start + duration
+    head = request.startswith(b"HEAD ")
+
+    async def connection():
+        while time.perf_counter() < deadline:
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port, ssl=context),
+                    _timeout(deadline),
+                )
+            except (OSError, asyncio.TimeoutError):
+                errors[0] += 1
+                await asyncio.sleep(0.01)
+                continue
+
+            try:
+                while True:
+                    sent = time.perf_counter()
+                    if sent >= deadline:
+                        return
+                    writer.write(request)
+                    status, keep_alive = await asyncio.wait_for(
+                        _read_response(reader, head), _timeout(deadline)
+                    )
+                    if 200 <= status < 400:
+                        latencies.append(time.perf_counter() - sent)
+                    else:
+                        errors[0] += 1
+                    if not keep_alive:
+                        break
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors[0] += 1
+            except asyncio.TimeoutError:
+                # The service did not answer before the end of the run.
+                errors[0] += 1
+                return
+            finally:
+                writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(connections)))
+
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def _timeout(deadline):
+    # Requests sent just before the deadline get a little longer to finish.
+    return max(deadline - time.perf_counter(), 0) + RESPONSE_GRACE
+
+
+async def _read_response(reader, head_only=False):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head[:-4].split(b"\r\n")
+    status = int(lines[0].split(b" ", 2)[1])
+
+    length = 0
+    chunked = False
+    keep_alive = True
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value
+        elif name == b"connection":
+            keep_alive = b"close" not in value
+
+    # Responses to HEAD requests, 1xx, 204 and 304 responses have no body,
+    # whatever their headers say.
+    if head_only or status < 200 or status in (204, 304):
+        return status, keep_alive
+
+    if chunked:
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+
+    return status, keep_alive
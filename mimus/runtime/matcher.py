@@ -0,0 +1,244 @@
+"""
+matcher selects services by request fields with compiled dispatch tables.
+"""
+import fnmatch
+import heapq
+import re
+
+from ..config.error import ConfigError
+from .template import lookup
+
+__all__ = (
+    "MatchTable",
+    "Matcher",
+    "RequestValues",
+)
+
+
+MATCH_SOURCES = ("headers", "query", "json")
+
+# Rule sources in the order they are preferred as index keys. The more
+# specific the source, the fewer endpoints share a key.
+INDEX_ORDER = ("json", "query", "headers", "path", "host", "method")
+
+_WILDCARD = re.compile(r"[*?\[]")
+
+
+class RequestValues:
+    """Extracts request fields for matching. The query string and the JSON
+    body are parsed at most once per request, and only if a rule needs them.
+    """
+
+    __slots__ = ("request", "_params", "_json")
+
+    _MISSING = object()
+
+    def __init__(self, request):
+        self.request = request
+        self._params = None
+        self._json = self._MISSING
+
+    def get(self, source, key=None):
+        request = self.request
+        if source == "method":
+            return request.method
+        if source == "host":
+            return request.host.lower()
+        if source == "path":
+            return request.path
+        if source == "headers":
+            return request.headers.get(key)
+        if source == "query":
+            if self._params is None:
+                self._params = request.params
+            return self._params.get(key)
+        if source == "json":
+            return lookup(self.json(), key)
+
+        raise ValueError(f"Unknown match source '{source}'")
+
+    def json(self):
+        if self._json is self._MISSING:
+            try:
+                self._json = self.request.json()
+            except ValueError:
+                self._json = None
+
+        return self._json
+
+
+class _Rule:
+    __slots__ = ("source", "key", "value", "pattern")
+
+    def __init__(self, source, key, value, glob):
+        self.source = source
+        self.key = key
+        self.value = value
+        self.pattern = None
+        if glob and isinstance(value, str) and _WILDCARD.search(value):
+            self.pattern = re.compile(fnmatch.translate(value))
+
+    @property
+    def exact(self):
+        return self.pattern is None and _hashable(self.value)
+
+    def matches(self, values):
+        actual = values.get(self.source, self.key)
+        if actual is None:
+            return False
+        if self.pattern is not None:
+            return self.pattern.match(str(actual)) is not None
+        if self.source == "json":
+            return _equal(actual, self.value)
+
+        return str(actual) == self.value
+
+
+class Matcher:
+    """The rules selecting requests for a service, compiled from its `host`
+    and the `method`, `path` and `match` attributes:
+
+        match:
+          query: {user_id: "42"}
+          headers: {x-tenant: "acme-*"}
+          json: {user.id: 42}
+
+    Values with `*`, `?` or `[` are glob patterns, except in `json` where
+    only strings can be patterns. Other values must be equal; query and
+    header values are compared as strings, JSON values must also have the
+    same type, so `true` does not match `1`.
+    """
+
+    def __init__(self, service):
+        attrs = service.protocol_attrs
+        # Rules are checked from the cheapest to the most expensive one.
+        rules = []
+
+        method = attrs.get("method")
+        if method:
+            rules.append(_Rule("method", None, str(method).upper(), glob=False))
+        if service.host:
+            rules.append(_Rule("host", None, service.host.lower(), glob=False))
+        path = attrs.get("path")
+        if path:
+            rules.append(_Rule("path", None, str(path), glob=True))
+
+        match = attrs.get("match") or {}
+        if not isinstance(match, dict):
+            raise ConfigError("match should be a dict", service=service.name)
+        for source in match:
+            if source not in MATCH_SOURCES:
+                raise ConfigError(
+                    f"Unknown match source '{source}'", service=service.name
+                )
+        for source in MATCH_SOURCES:
+            fields = match.get(source)
+            if fields is None:
+                continue
+            if not isinstance(fields, dict):
+                raise ConfigError(
+                    f"match.{source} should be a dict", service=service.name
+                )
+            for key, value in fields.items():
+                key = str(key).lower() if source == "headers" else str(key)
+                if source != "json":
+                    value = str(value)
+                rules.append(_Rule(source, key, value, glob=True))
+
+        self.rules = rules
+
+    @property
+    def index_rule(self):
+        """The exact rule used as the key of the dispatch table."""
+        exact = [rule for rule in self.rules if rule.exact]
+        if not exact:
+            return None
+
+        return min(exact, key=lambda rule: INDEX_ORDER.index(rule.source))
+
+    def matches(self, values):
+        for rule in self.rules:
+            if not rule.matches(values):
+                return False
+
+        return True
+
+
+class MatchTable:
+    """Finds the first of a list of endpoints whose `Matcher` accepts a
+    request.
+
+    Every endpoint is indexed by its most specific exact rule. Endpoints
+    indexed by the same (source, key) share one hash table keyed by the
+    expected value. A request then needs one lookup per (source, key) to find
+    its candidates, instead of trying every endpoint. Only endpoints without
+    exact rules, e.g. with only wildcard rules, are tried every time.
+    Candidates are tried in definition order.
+    """
+
+    def __init__(self, endpoints):
+        self.endpoints = list(endpoints)
+        self._indexes = {}
+        self._unindexed = []
+
+        for position, endpoint in enumerate(self.endpoints):
+            rule = endpoint.matcher.index_rule
+            if rule is None:
+                self._unindexed.append(position)
+                continue
+
+            index = self._indexes.setdefault((rule.source, rule.key), {})
+            index.setdefault(_key(rule.value), []).append(position)
+
+    def candidates(self, values):
+        lists = [self._unindexed]
+        for (source, key), index in self._indexes.items():
+            value = values.get(source, key)
+            if value is None:
+                continue
+            if source != "json":
+                value = str(value)
+            elif not _hashable(value):
+                continue
+
+            positions = index.get(_key(value))
+            if positions:
+                lists.append(positions)
+
+        if len(lists) == 1:
+            return [self.endpoints[position] for position in lists[0]]
+
+        return [self.endpoints[position] for position in heapq.merge(*lists)]
+
+    def match(self, request):
+        values = RequestValues(request)
+        for endpoint in self.candidates(values):
+            if endpoint.matcher.matches(values):
+                return endpoint
+
+        return None
+
+
+def _hashable(value):
+    return isinstance(value, (str, int, float, bool))
+
+
+def _key(value):
+    # JSON true is not 1, and 1.0 is not 1, although they are equal and hash
+    # the same in Python.
+    return type(value), value
+
+
+def _equal(actual, expected):
+    if type(actual) is not type(expected):
+        return False
+    if isinstance(expected, dict):
+        return actual.keys() == expected.keys() and all(
+            _equal(actual[key], value) for key, value in expected.items()
+        )
+    if isinstance(expected, list):
+        return len(actual) == len(expected) and all(
+            _equal(a, e) for a, e in zip(actual, expected)
+        )
+
+    return actual == expected
@@ -0,0 +1,118 @@
+"""
+ports allocates ports for services that don't define one.
+"""
+import json
+import os
+import socket
+from pathlib import Path
+
+from .adapters import get_adapter
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+__all__ = (
+    "PortAllocator",
+    "read_discovery",
+)
+
+
+class PortAllocator:
+    """Reserves ports for services whose `port` is 0.
+
+    Instead of probing for a free port and closing the socket, which leaves a
+    window for another process to take the port, each dynamic port is bound
+    once and the bound socket is kept until the runtime takes it over with
+    `take`. The kernel picks the port numbers, so allocation is a single
+    `bind` per service without any retry.
+    """
+
+    def __init__(self, host="127.0.0.1"):
+        self.host = host
+        self.ports = {}
+        self.sockets = {}
+
+    def allocate(self, services):
+        """Assign a port to every service and return the name to port map.
+        Services with a non-zero port keep it as is.
+        """
+        services = [s for s in services if s.name not in self.ports]
+        _ensure_fd_limit(sum(1 for s in services if not s.port))
+
+        for service in services:
+            if service.port:
+                self.ports[service.name] = service.port
+                continue
+
+            sock = socket.socket(_family(self.host), _socket_type(service))
+            try:
+                sock.bind((self.host, 0))
+            except OSError:
+                sock.close()
+                raise
+
+            self.sockets[service.name] = sock
+            self.ports[service.name] = sock.getsockname()[1]
+
+        return dict(self.ports)
+
+    def take(self, name):
+        """Hand over the reserved socket of service `name`. The caller owns
+        the socket afterwards. Returns None if the port was not allocated
+        dynamically.
+        """
+        return self.sockets.pop(name, None)
+
+    def write_discovery(self, path):
+        """Write the name to port map to `path` as JSON. The file is replaced
+        atomically, so readers never see a partially written map.
+        """
+        path = Path(path)
+        content = json.dumps(dict(host=self.host, ports=self.ports))
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(content)
+        os.replace(str(tmp_path), str(path))
+
+    def close(self):
+        for sock in self.sockets.values():
+            sock.close()
+        self.sockets.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_discovery(path):
+    """Read the name to port map written by `PortAllocator.write_discovery`."""
+    with open(path) as f:
+        return json.load(f)["ports"]
+
+
+def _family(host):
+    return socket.AF_INET6 if ":" in host else socket.AF_INET
+
+
+def _socket_type(service):
+    return get_adapter(service.protocol).socket_type
+
+
+def _ensure_fd_limit(count):
+    # Thousands of reserved sockets easily exceed the common default soft
+    # limit of 1024 open files, so raise it up to the hard limit if needed.
+    if resource is None or count == 0:
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = count + 256
+    if soft == resource.RLIM_INFINITY or soft >= wanted:
+        return
+    if hard != resource.RLIM_INFINITY:
+        wanted = min(wanted, hard)
+
+    resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
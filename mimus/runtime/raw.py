@@ -0,0 +1,282 @@
+"""
+raw serves services speaking custom protocols over TCP or UDP.
+"""
+import asyncio
+import inspect
+import logging
+import socket
+
+from ..config.error import ConfigError
+from .adapters import ProtocolAdapter, register_adapter
+from .executor import ExecutorBusy, executor_for
+from .framing import FramingError, framer_factory
+from .handler import load_handler
+from .tls import uses_tls
+
+__all__ = (
+    "DatagramServer",
+    "RawEndpoint",
+    "TCPAdapter",
+    "TCPProtocol",
+    "UDPAdapter",
+    "UDPProtocol",
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class RawEndpoint:
+    """Answers the frames, or datagrams, received by a raw service.
+
+    The handler of the service is called with each frame and returns the
+    reply as bytes or str, or None to not reply. Coroutine handlers run on
+    the event loop, other handlers in the `HandlerExecutor` of the service,
+    and both get a copy of the frame as bytes. Only inline executors call
+    the handler with the frame itself, a `memoryview` valid during the call.
+    Frames rejected by a busy executor, or whose handler raises, are not
+    answered. Without a handler, frames are answered with the fixed `reply`
+    attribute, if any.
+    """
+
+    def __init__(self, service, executor=None):
+        self.service = service
+        self.handler = load_handler(service.handler) if service.handler else None
+        self.executor = executor_for(service, self.handler, executor)
+
+        self.reply = service.protocol_attrs.get("reply")
+        if isinstance(self.reply, str):
+            self.reply = self.reply.encode()
+
+    def __call__(self, frame):
+        if self.handler is None:
+            return self.reply
+        try:
+            if self.executor is None:
+                return self.handler(bytes(frame))
+            if self.executor.kind == "inline":
+                return self.handler(frame)
+        except Exception:  # pylint: disable=broad-except
+            self._log_error()
+            return None
+
+        return self._run(bytes(frame))
+
+    async def wait(self, reply):
+        """Await a reply returned by `__call__`, or return None if it raises."""
+        try:
+            return await reply
+        except asyncio.CancelledError:  # pylint: disable=try-except-raise
+            # An Exception before Python 3.8.
+            raise
+        except Exception:  # pylint: disable=broad-except
+            self._log_error()
+            return None
+
+    def _log_error(self):
+        logger.exception("Error while answering a frame of %s", self.service.name)
+
+    async def _run(self, frame):
+        try:
+            return await self.executor.run(self.service.handler, self.handler, frame)
+        except ExecutorBusy:
+            return None
+
+
+class TCPProtocol(asyncio.Protocol):
+    """Serves one connection of a raw TCP service. Replies are written in
+    the order of the frames they answer, even if some handlers are
+    coroutines. Reading pauses while the transport's write buffer is full.
+    """
+
+    def __init__(self, endpoint, framer):
+        self.endpoint = endpoint
+        self.framer = framer
+        self.transport = None
+        self._tail = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        if self._tail is not None:
+            self._tail.cancel()
+        self.transport = None
+
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        try:
+            for frame in self.framer.feed(data):
+                self._reply(self.endpoint(frame))
+        except FramingError:
+            self.transport.close()
+
+    def _reply(self, reply):
+        if self._tail is not None and self._tail.done():
+            self._tail = None
+
+        if self._tail is None and not inspect.isawaitable(reply):
+            self._write(reply)
+            return
+
+        self._tail = asyncio.ensure_future(self._reply_later(self._tail, reply))
+
+    async def _reply_later(self, previous, reply):
+        # Links never raise, so an error answering a frame does not stop the
+        # replies to the next ones.
+        try:
+            if previous is not None:
+                await previous
+        except asyncio.CancelledError:
+            if inspect.iscoroutine(reply):
+                reply.close()
+            raise
+        if inspect.isawaitable(reply):
+            reply = await self.endpoint.wait(reply)
+        self._write(reply)
+
+    def _write(self, reply):
+        if reply is None or self.transport is None:
+            return
+        self.transport.writelines(self.framer.encode(_to_bytes(reply)))
+
+
+class UDPProtocol(asyncio.DatagramProtocol):
+    """Serves a raw UDP service, one datagram being one frame."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.transport = None
+        self.closed = asyncio.get_event_loop().create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+    def datagram_received(self, data, addr):
+        with memoryview(data) as frame:
+            reply = self.endpoint(frame)
+            if not inspect.isawaitable(reply):
+                self._send(reply, addr)
+                return
+
+        asyncio.ensure_future(self._reply_later(reply, addr))
+
+    async def _reply_later(self, reply, addr):
+        self._send(await self.endpoint.wait(reply), addr)
+
+    def _send(self, reply, addr):
+        if reply is None or self.transport is None:
+            return
+        self.transport.sendto(_to_bytes(reply), addr)
+
+
+class DatagramServer:
+    """A datagram endpoint with the interface of `asyncio.Server` used by the
+    runtime.
+    """
+
+    def __init__(self, transport, protocol):
+        self.transport = transport
+        self.protocol = protocol
+
+    def close(self):
+        self.transport.close()
+
+    async def wait_closed(self):
+        await self.protocol.closed
+
+    async def serve_forever(self):
+        await self.protocol.closed
+
+
+class _RawAdapter(ProtocolAdapter):  # pylint: disable=abstract-method
+    @staticmethod
+    def _endpoint(runtime, services):
+        # A raw protocol has no request to route on, so every service needs
+        # its own port.
+        if len(services) > 1:
+            raise ConfigError(
+                f"{services[0].protocol} services cannot share a port",
+                service=", ".join(service.name for service in services),
+            )
+
+        return RawEndpoint(services[0], runtime.executors[services[0].name])
+
+
+class TCPAdapter(_RawAdapter):
+    """Serves services with the `tcp` protocol. Frames are split by the
+    framer set with the `framing` attribute, lines by default.
+    """
+
+    def validate(self, service):
+        try:
+            framer_factory(service.protocol_attrs)
+        except ConfigError as e:
+            raise ConfigError(e, service=service.name) from e
+
+    async def listen(self, runtime, services, port, sock=None):
+        endpoint = self._endpoint(runtime, services)
+        framer = framer_factory(services[0].protocol_attrs)
+        ssl = runtime.tls.for_listener(services)
+
+        def factory():
+            return TCPProtocol(endpoint, framer())
+
+        loop = asyncio.get_event_loop()
+        if sock is not None:
+            return await loop.create_server(factory, sock=sock, ssl=ssl)
+
+        return await loop.create_server(factory, runtime.host, port, ssl=ssl)
+
+
+class UDPAdapter(_RawAdapter):
+    """Serves services with the `udp` protocol."""
+
+    socket_type = socket.SOCK_DGRAM
+
+    def validate(self, service):
+        if uses_tls(service):
+            raise ConfigError("udp services cannot use TLS", service=service.name)
+
+    async def listen(self, runtime, services, port, sock=None):
+        endpoint = self._endpoint(runtime, services)
+
+        def factory():
+            return UDPProtocol(endpoint)
+
+        loop = asyncio.get_event_loop()
+        if sock is not None:
+            transport, protocol = await loop.create_datagram_endpoint(
+                factory, sock=sock
+            )
+        else:
+            transport, protocol = await loop.create_datagram_endpoint(
+                factory, local_addr=(runtime.host, port)
+            )
+
+        return DatagramServer(transport, protocol)
+
+
+def _to_bytes(reply):
+    if isinstance(reply, str):
+        return reply.encode()
+    if isinstance(reply, memoryview):
+        # A frame returned as is, e.g. by an echo handler, is released once
+        # the handler returns, while the transport may still buffer it.
+        return bytes(reply)
+
+    return reply
+
+
+register_adapter("tcp", TCPAdapter())
+register_adapter("udp", UDPAdapter())
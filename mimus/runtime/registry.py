@@ -0,0 +1,257 @@
+"""
+registry shares resolved services between worker processes.
+"""
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from ..config.parser import BasicServiceItem, HandlerField
+
+__all__ = (
+    "ServiceRecord",
+    "ServiceRegistry",
+    "export_services",
+)
+
+
+MAGIC = b"MIMUSREG"
+VERSION = 1
+
+# magic, version, generation, record count, string table offset
+_HEADER = struct.Struct("<8sIQII")
+
+# (offset, length) pairs of name, host, protocol, handler fqn, handler origin
+# and JSON encoded protocol attributes in the string table, then port and
+# flags.
+_RECORD = struct.Struct("<12IHH")
+_STRINGS = ("name", "host", "protocol", "fqn", "origin", "protocol_attrs")
+_HAS_HANDLER = 0x1
+
+
+def export_services(services, path):
+    """Export `services` into the registry file at `path`.
+
+    Records have a fixed layout and refer to a shared string table, so
+    workers read them straight from the mapped file. Put `path` on a tmpfs
+    such as /dev/shm to keep it in memory. The file is replaced atomically,
+    and its generation is one more than the one it replaces, so attached
+    workers keep reading the old generation until they `refresh`.
+    """
+    path = Path(path)
+    generation = _read_generation(path) + 1
+
+    strings = _StringTable()
+    records = []
+    for service in sorted(services, key=lambda s: s.name):
+        handler = service.handler
+        values = (
+            service.name,
+            service.host,
+            service.protocol,
+            handler.fqn if handler else "",
+            str(handler.origin) if handler else "",
+            json.dumps(service.protocol_attrs, default=str),
+        )
+
+        fields = []
+        for value in values:
+            fields.extend(strings.add(value))
+        flags = _HAS_HANDLER if handler else 0
+        records.append(_RECORD.pack(*fields, service.port, flags))
+
+    offset = _HEADER.size + _RECORD.size * len(records)
+    header = _HEADER.pack(MAGIC, VERSION, generation, len(records), offset)
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.writelines(records)
+        f.write(strings.data)
+    os.replace(str(tmp_path), str(path))
+
+    return generation
+
+
+class ServiceRegistry:
+    """A read-only view of a registry file exported by `export_services`.
+
+    The file is memory mapped, so every worker attached to the same
+    generation shares one copy of the records.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._attach()
+
+    def _attach(self):
+        with open(self.path, "rb") as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+
+        magic, version, generation, count, offset = _HEADER.unpack_from(self._buf)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"'{self.path}' is not a mimus registry file")
+
+        self.generation = generation
+        self._count = count
+        self._strtab = offset
+
+    def refresh(self):
+        """Attach to the newest generation if the file has been replaced.
+        Returns whether the generation changed.
+        """
+        if os.stat(self.path).st_ino == self._inode:
+            return False
+
+        self.close()
+        self._attach()
+        return True
+
+    def close(self):
+        self._buf.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError("registry index out of range")
+
+        return ServiceRecord(self, _HEADER.size + index * _RECORD.size)
+
+    def __iter__(self):
+        return (self[index] for index in range(self._count))
+
+    def find(self, name):
+        """Look up a record by name with a binary search over the records,
+        which are sorted by name on export.
+        """
+        encoded = name.encode()
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            current = bytes(self[mid].raw("name"))
+            if current < encoded:
+                low = mid + 1
+            elif current > encoded:
+                high = mid
+            else:
+                return self[mid]
+
+        return None
+
+    @property
+    def buffer(self):
+        """The mapped file, valid until the registry is refreshed or closed."""
+        return self._buf
+
+    def string(self, offset, length):
+        """Return the `length` bytes at `offset` in the string table as a
+        memoryview into the mapped file.
+        """
+        start = self._strtab + offset
+        return self._buf[start : start + length]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ServiceRecord:
+    """A record in a `ServiceRegistry`. Fields are read from the mapped file
+    on access.
+    """
+
+    __slots__ = ("_registry", "_offset")
+
+    def __init__(self, registry, offset):
+        self._registry = registry
+        self._offset = offset
+
+    def raw(self, field):
+        """Return field `field` as a memoryview into the string table. The
+        view has to be released before the registry is refreshed or closed.
+        """
+        index = _STRINGS.index(field) * 2
+        offset, length = struct.unpack_from(
+            "<2I", self._registry.buffer, self._offset + index * 4
+        )
+        return self._registry.string(offset, length)
+
+    @property
+    def name(self):
+        return str(self.raw("name"), "utf-8")
+
+    @property
+    def host(self):
+        return str(self.raw("host"), "utf-8")
+
+    @property
+    def protocol(self):
+        return str(self.raw("protocol"), "utf-8")
+
+    @property
+    def port(self):
+        return _RECORD.unpack_from(self._registry.buffer, self._offset)[12]
+
+    @property
+    def protocol_attrs(self):
+        return json.loads(str(self.raw("protocol_attrs"), "utf-8"))
+
+    @property
+    def handler(self):
+        flags = _RECORD.unpack_from(self._registry.buffer, self._offset)[13]
+        if not flags & _HAS_HANDLER:
+            return None
+
+        fqn = str(self.raw("fqn"), "utf-8")
+        origin = Path(str(self.raw("origin"), "utf-8"))
+        return HandlerField(fqn, origin)
+
+    def to_service(self):
+        return BasicServiceItem(
+            name=self.name,
+            host=self.host,
+            port=self.port,
+            protocol=self.protocol,
+            protocol_attrs=self.protocol_attrs,
+            handler=self.handler,
+        )
+
+    def __repr__(self):
+        return f"ServiceRecord(name={self.name!r})"
+
+
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets = {}
+
+    def add(self, value):
+        encoded = value.encode()
+        if encoded not in self._offsets:
+            self._offsets[encoded] = len(self.data)
+            self.data += encoded
+
+        return self._offsets[encoded], len(encoded)
+
+
+def _read_generation(path):
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return 0
+
+    if len(header) < _HEADER.size:
+        return 0
+
+    magic, _, generation, _, _ = _HEADER.unpack(header)
+    return generation if magic == MAGIC else 0
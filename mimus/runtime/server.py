@@ -0,0 +1,307 @@
+"""
+server runs the resolved services.
+"""
+import asyncio
+import inspect
+from functools import partial
+
+from ..config.error import ConfigError
+from .adapters import ProtocolAdapter, get_adapter, register_adapter
+from .executor import ExecutorBusy, HandlerExecutor, executor_for
+from .faults import FaultInjector
+from .handler import load_handler
+from .http import HTTPProtocol, Response, StreamingResponse
+from .http2 import available as http2_available
+from .journal import RequestJournal
+from .limit import ServiceLimits
+from .matcher import Matcher, MatchTable, RequestValues
+from .ports import PortAllocator
+from .streaming import SyntheticPayload
+from .template import ResponseTemplate
+from .timer import TimerWheel
+from .tls import default_cache
+
+__all__ = (
+    "Endpoint",
+    "HTTPAdapter",
+    "Router",
+    "Runtime",
+)
+
+
+class Endpoint:
+    """Serves the requests of one service.
+
+    A request is selected by the `host` of the service and the `method`,
+    `path` (a glob pattern) and `match` rules in its `protocol_attrs` (see
+    `Matcher`). It is then answered with the response template of the
+    service, its synthetic `payload`, or by calling its handler. Coroutine
+    handlers run on the event loop, other handlers in the `HandlerExecutor`
+    of the service. Requests are recorded in `journal`, if given.
+
+    A streamed response holds its concurrency slot, and is recorded, until
+    its body is sent.
+    """
+
+    def __init__(self, service, wheel, limits=None, executor=None, journal=None):
+        self.service = service
+        attrs = service.protocol_attrs
+
+        self.matcher = Matcher(service)
+        self.template = ResponseTemplate.from_attrs(attrs)
+        self.faults = FaultInjector.from_attrs(attrs)
+        try:
+            self.payload = SyntheticPayload.from_attrs(attrs)
+        except ConfigError as e:
+            raise ConfigError(e, service=service.name) from e
+        self.limits = ServiceLimits.from_service(service, limits)
+        self.handler = load_handler(service.handler) if service.handler else None
+        self.executor = executor_for(service, self.handler, executor)
+        self.journal = journal
+        self._wheel = wheel
+
+        if self.template is not None:
+            self._fields = {path.split(".")[0] for path in self.template.variables}
+
+    @property
+    def name(self):
+        return self.service.name
+
+    def matches(self, request):
+        return self.matcher.matches(RequestValues(request))
+
+    async def __call__(self, request):
+        if self.journal is None:
+            return await self._limit(request)
+
+        try:
+            response = await self._limit(request)
+        except BaseException:
+            self.journal.record(request, 500)
+            raise
+
+        _when_sent(response, self.journal.record, request, response.status)
+        return response
+
+    async def _limit(self, request):
+        limits = self.limits
+        if limits is None:
+            return await self._handle(request)
+
+        status = limits.enter()
+        if status is not None:
+            headers = {}
+            if status == limits.rate_status and limits.bucket is not None:
+                headers["retry-after"] = limits.bucket.retry_after
+            return Response(status, headers)
+
+        try:
+            response = await self._handle(request)
+        except BaseException:
+            limits.exit()
+            raise
+
+        _when_sent(response, limits.exit)
+        return response
+
+    async def _handle(self, request):
+        if self.faults is not None:
+            status = await self.faults.apply(self._wheel)
+            if status is not None:
+                return Response(status)
+
+        if self.template is not None:
+            template = self.template
+            body = template.render(request.context(self._fields))
+            return Response(template.status, template.headers, body)
+
+        if self.payload is not None:
+            payload = self.payload
+            headers = {
+                "content-type": payload.content_type,
+                "content-length": payload.size,
+            }
+            return StreamingResponse(payload, headers=headers)
+
+        if self.handler is not None:
+            if self.executor is None:
+                result = self.handler(request)
+            else:
+                try:
+                    result = await self.executor.run(
+                        self.service.handler, self.handler, request
+                    )
+                except ExecutorBusy:
+                    return Response(self.executor.status)
+            if inspect.isawaitable(result):
+                result = await result
+            return Response.from_result(result)
+
+        return Response(200)
+
+
+class Router:
+    """Dispatches the requests on one listening socket to the first matching
+    endpoint, in the order the services were defined.
+    """
+
+    def __init__(self, endpoints):
+        self.endpoints = list(endpoints)
+        self.table = MatchTable(self.endpoints)
+
+    async def __call__(self, request):
+        endpoint = self.table.match(request)
+        if endpoint is None:
+            return Response(404)
+
+        return await endpoint(request)
+
+
+class HTTPAdapter(ProtocolAdapter):
+    """Serves services with the `http` or `http2` protocol, or none. HTTP/2
+    requires the optional h2 package.
+    """
+
+    def validate(self, service):
+        if _uses_http2(service) and not http2_available():
+            raise ConfigError(
+                "HTTP/2 support requires the 'h2' package", service=service.name
+            )
+
+    async def listen(self, runtime, services, port, sock=None):
+        router = Router(
+            Endpoint(
+                service,
+                runtime.wheel,
+                runtime.limits,
+                runtime.executors[service.name],
+                runtime.journals.get(service.name),
+            )
+            for service in services
+        )
+        http2 = any(_uses_http2(service) for service in services)
+        alpn = ("h2", "http/1.1") if http2 else ("http/1.1",)
+        ssl = runtime.tls.for_listener(services, alpn)
+
+        def factory():
+            return HTTPProtocol(router, http2=http2)
+
+        loop = asyncio.get_event_loop()
+        if sock is not None:
+            return await loop.create_server(factory, sock=sock, ssl=ssl)
+
+        return await loop.create_server(factory, runtime.host, port, ssl=ssl)
+
+
+class Runtime:
+    """Runs `services`, normally from `Parser.iter_service`.
+
+    Each service is served by the adapter registered for its `protocol` (see
+    `register_adapter`). Services with the same fixed port share a listening
+    socket. Every service with port 0 gets its own port from a
+    `PortAllocator`. Services with `tlscert` and `tlskey` are served over TLS
+    with contexts from `tls`.
+
+    Rate limits and concurrency caps are counted per process, unless a
+    `SharedLimitStore` created before forking the workers is given. The
+    `executors` running blocking handlers, by service name, expose metrics.
+    The `journals` of the services with a `journal` attribute record their
+    requests.
+    """
+
+    def __init__(self, services, host="127.0.0.1", tls=default_cache, limits=None):
+        self.services = list(services)
+        self.host = host
+        self.tls = tls
+        self.limits = limits
+        self.allocator = PortAllocator(host)
+        self.wheel = TimerWheel()
+        self.ports = {}
+        self.servers = []
+        self.adapters = {}
+        self.executors = {}
+        self.journals = {}
+
+        for service in self.services:
+            try:
+                adapter = get_adapter(service.protocol)
+            except ConfigError as e:
+                raise ConfigError(e, service=service.name) from e
+            adapter.validate(service)
+            self.adapters[service.name] = adapter
+            self.executors[service.name] = HandlerExecutor.from_service(service)
+
+    @classmethod
+    def from_parser(cls, parser, **kwargs):
+        return cls(parser.iter_service(), **kwargs)
+
+    async def start(self):
+        self.ports = self.allocator.allocate(self.services)
+        for service in self.services:
+            journal = RequestJournal.from_service(service)
+            if journal is not None:
+                self.journals[service.name] = journal
+
+        for port, services in self._listeners().items():
+            adapter = self.adapters[services[0].name]
+            if any(self.adapters[service.name] is not adapter for service in services):
+                raise ConfigError(
+                    "Services sharing a port should use the same protocol",
+                    service=", ".join(service.name for service in services),
+                )
+
+            sock = self.allocator.take(services[0].name)
+            server = await adapter.listen(self, services, port, sock)
+            self.servers.append(server)
+
+        return self.ports
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+        for server in self.servers:
+            await server.wait_closed()
+
+        self.servers.clear()
+        self.allocator.close()
+        for executor in self.executors.values():
+            executor.shutdown()
+        for journal in self.journals.values():
+            journal.close()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in self.servers))
+        finally:
+            await self.stop()
+
+    def _listeners(self):
+        listeners = {}
+        for service in self.services:
+            listeners.setdefault(self.ports[service.name], []).append(service)
+
+        return listeners
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+def _when_sent(response, callback, *args):
+    if isinstance(response, StreamingResponse):
+        response.add_close_callback(partial(callback, *args))
+    else:
+        callback(*args)
+
+
+def _uses_http2(service):
+    return service.protocol == "http2" or bool(service.protocol_attrs.get("http2"))
+
+
+_http = HTTPAdapter()
+for _protocol in ("", "http", "http2"):
+    register_adapter(_protocol, _http)
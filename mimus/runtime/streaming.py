@@ -0,0 +1,204 @@
+"""
+streaming produces response bodies while they are sent.
+"""
+import asyncio
+import json
+import random
+import re
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "SyntheticPayload",
+    "close_body",
+    "encode_event",
+    "event_stream",
+    "iter_chunks",
+)
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_SIZE = re.compile(r"^\s*(\d+)\s*([kmg]?)i?b?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+# Returned by the blocking reads once a body is exhausted.
+_END = object()
+
+# Consecutive chunks of a synthetic payload start this many bytes apart in
+# its random block, a prime so that they rarely repeat.
+_STRIDE = 7919
+
+
+def iter_chunks(body, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return an async iterator over the chunks of a streaming body, as
+    bytes-like objects. `body` is an iterable or async iterable of bytes or
+    str, or a binary file-like object read `chunk_size` bytes at a time. It
+    is closed once iterated.
+
+    Files and sync iterables are read and closed in the default executor of
+    the event loop, so they can block. Async iterables, which can wait
+    between chunks, and `SyntheticPayload`, which only slices memory, are
+    read on the event loop.
+    """
+    if hasattr(body, "read"):
+        return _read_in_executor(body, _read_chunk, body, chunk_size)
+    if hasattr(body, "__aiter__") or isinstance(body, SyntheticPayload):
+        return _read_inline(body)
+
+    return _read_in_executor(body, next, iter(body), _END)
+
+
+async def _read_inline(body):
+    try:
+        if hasattr(body, "__aiter__"):
+            async for chunk in body:
+                yield _to_bytes(chunk)
+        else:
+            for chunk in body:
+                yield chunk
+    finally:
+        await close_body(body)
+
+
+async def _read_in_executor(body, read, *args):
+    # `read(*args)` returns the next chunk, or _END.
+    loop = asyncio.get_event_loop()
+    future = None
+    try:
+        while True:
+            future = loop.run_in_executor(None, read, *args)
+            # Shielded so that if the stream is cancelled, the future is
+            # still pending while the executor reads.
+            chunk = await asyncio.shield(future)
+            if chunk is _END:
+                return
+            yield _to_bytes(chunk)
+    finally:
+        if hasattr(body, "close"):
+            if future is not None and not future.done():
+                # A generator cannot be closed while a worker runs it, so
+                # close it once the pending read returns.
+                future.add_done_callback(lambda _: body.close())
+            else:
+                await loop.run_in_executor(None, body.close)
+
+
+async def close_body(body):
+    if hasattr(body, "aclose"):
+        await body.aclose()
+    elif hasattr(body, "close"):
+        body.close()
+
+
+def encode_event(event):
+    """Encode a server-sent event. `event` is the data, or a dict with `data`
+    and optionally `event`, `id` and `retry`. Data other than str is sent as
+    JSON.
+    """
+    if not isinstance(event, dict):
+        event = {"data": event}
+
+    lines = [
+        f"{field}: {event[field]}"
+        for field in ("event", "id", "retry")
+        if field in event
+    ]
+    data = event.get("data", "")
+    if isinstance(data, bytes):
+        data = data.decode()
+    elif not isinstance(data, str):
+        data = json.dumps(data)
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def event_stream(events):
+    """Encode the events of an iterable or async iterable as they come."""
+    try:
+        if hasattr(events, "__aiter__"):
+            async for event in events:
+                yield encode_event(event)
+        else:
+            for event in events:
+                yield encode_event(event)
+    finally:
+        await close_body(events)
+
+
+class SyntheticPayload:
+    """A pseudo-random body of `size` bytes, the same for the same `seed`:
+
+        payload: {size: 2G, seed: 42, chunk_size: 65536}
+
+    `payload: <size>` is a short form. Sizes are in bytes, or with a K, M or
+    G suffix. Chunks are views of one random block of `chunk_size` bytes,
+    each starting at a different offset, so the memory used does not depend
+    on `size`.
+    """
+
+    def __init__(
+        self,
+        size,
+        seed=0,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        content_type="application/octet-stream",
+    ):
+        self.size = _parse_size(size)
+        self.seed = seed
+        self.chunk_size = _parse_size(chunk_size)
+        self.content_type = content_type
+        if self.chunk_size < 1:
+            raise ConfigError("payload chunk_size should be positive")
+
+        block = random.Random(seed).getrandbits(self.chunk_size * 8)
+        block = block.to_bytes(self.chunk_size, "little")
+        self._block = memoryview(block + block)
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        """Build the payload set by the `payload` attribute, or return None."""
+        config = attrs.get("payload")
+        if config is None:
+            return None
+        if not isinstance(config, dict):
+            config = {"size": config}
+
+        try:
+            return cls(**config)
+        except TypeError as e:
+            raise ConfigError(f"Invalid payload: {e}") from e
+
+    def __iter__(self):
+        block = self._block
+        chunk_size = self.chunk_size
+        remaining = self.size
+        offset = 0
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            yield block[offset : offset + size]
+            remaining -= size
+            offset = (offset + _STRIDE) % chunk_size
+
+
+def _parse_size(size):
+    if isinstance(size, int) and not isinstance(size, bool) and size >= 0:
+        return size
+
+    match = _SIZE.match(size) if isinstance(size, str) else None
+    if match is None:
+        raise ConfigError(f"Invalid size '{size}'")
+
+    return int(match.group(1)) * _UNITS[match.group(2).lower()]
+
+
+def _read_chunk(file, chunk_size):
+    return file.read(chunk_size) or _END
+
+
+def _to_bytes(chunk):
+    if isinstance(chunk, str):
+        return chunk.encode()
+
+    return chunk
@@ -0,0 +1,218 @@
+"""
+template renders response bodies from templates in `protocol_attrs`.
+"""
+import json
+import re
+from functools import lru_cache
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "DEFAULT_CACHE_SIZE",
+    "ResponseTemplate",
+    "lookup",
+)
+
+
+DEFAULT_CACHE_SIZE = 1024
+
+_PLACEHOLDER = re.compile(r"{{\s*([\w.-]+)\s*}}")
+
+
+class ResponseTemplate:
+    """A response body template compiled once at config load.
+
+    A template is either a string, rendered as plain text, or a YAML
+    structure, rendered as JSON. Strings in it may refer to the request
+    context with `{{ params.user_id }}`. A string that is a single
+    placeholder is replaced by the JSON value itself, otherwise the values
+    are interpolated into the string.
+
+    Compiling flattens the template into literal chunks and slots, so
+    rendering only looks up the variables it uses and joins the chunks.
+    Rendered bodies are cached by the values of those variables.
+    """
+
+    def __init__(
+        self, template, status=200, headers=None, cache_size=DEFAULT_CACHE_SIZE
+    ):
+        self.status = status
+        self.headers = dict(headers or {})
+
+        parts = []
+        if isinstance(template, str):
+            _compile_text(template, parts, quote=False)
+            self.headers.setdefault("content-type", "text/plain; charset=utf-8")
+        else:
+            _compile_json(template, parts)
+            self.headers.setdefault("content-type", "application/json")
+
+        parts = _merge_literals(parts)
+        self.variables = tuple(sorted({part.path for part in parts if _is_slot(part)}))
+
+        # Slots are replaced in place in this buffer on every render, so a
+        # template must only be rendered from one thread at a time.
+        self._buffer = [part if isinstance(part, str) else "" for part in parts]
+        self._slots = [
+            (index, self.variables.index(part.path), part.encode)
+            for index, part in enumerate(parts)
+            if _is_slot(part)
+        ]
+
+        if cache_size:
+            self._render_cached = lru_cache(maxsize=cache_size)(self._render_typed)
+        else:
+            self._render_cached = self._render_typed
+
+    @classmethod
+    def from_attrs(cls, protocol_attrs):
+        """Compile the `response` attribute of a service, or return None if
+        the service does not define one.
+        """
+        attrs = protocol_attrs.get("response")
+        if attrs is None:
+            return None
+        if not isinstance(attrs, dict) or "template" not in attrs:
+            raise ConfigError("response should be a dict with a 'template' field")
+
+        status = attrs.get("status", 200)
+        if not isinstance(status, int):
+            raise ConfigError("response status should be an int")
+
+        return cls(
+            attrs["template"],
+            status=status,
+            headers=attrs.get("headers"),
+            cache_size=attrs.get("cache_size", DEFAULT_CACHE_SIZE),
+        )
+
+    def render(self, context):
+        """Render the body with values looked up in `context`, a mapping such
+        as `{"params": {...}, "headers": {...}}`.
+        """
+        values = tuple(lookup(context, path) for path in self.variables)
+        try:
+            # True, 1 and 1.0 are equal keys but render differently, so the
+            # types of the values are part of the key.
+            return self._render_cached(values, tuple(map(type, values)))
+        except TypeError:
+            # Unhashable values (e.g. lists from a JSON body) are not cached.
+            return self._render(values)
+
+    def _render_typed(self, values, _types):
+        return self._render(values)
+
+    def _render(self, values):
+        buffer = self._buffer
+        for index, value_index, encode in self._slots:
+            buffer[index] = encode(values[value_index])
+
+        return "".join(buffer).encode()
+
+
+class _Slot:
+    __slots__ = ("path", "encode")
+
+    def __init__(self, path, encode):
+        self.path = path
+        self.encode = encode
+
+
+def _is_slot(part):
+    return isinstance(part, _Slot)
+
+
+def _compile_json(obj, parts):
+    if isinstance(obj, dict):
+        parts.append("{")
+        for index, (key, value) in enumerate(obj.items()):
+            if index:
+                parts.append(", ")
+            parts.append(json.dumps(str(key)) + ": ")
+            _compile_json(value, parts)
+        parts.append("}")
+
+    elif isinstance(obj, (list, tuple)):
+        parts.append("[")
+        for index, value in enumerate(obj):
+            if index:
+                parts.append(", ")
+            _compile_json(value, parts)
+        parts.append("]")
+
+    elif isinstance(obj, str):
+        match = _PLACEHOLDER.fullmatch(obj)
+        if match:
+            parts.append(_Slot(match.group(1), _encode_json))
+        else:
+            _compile_text(obj, parts, quote=True)
+
+    else:
+        parts.append(json.dumps(obj))
+
+
+def _compile_text(text, parts, quote):
+    escape = _escape_json if quote else str
+    encode = _encode_json_string if quote else _encode_text
+
+    if quote:
+        parts.append('"')
+
+    start = 0
+    for match in _PLACEHOLDER.finditer(text):
+        parts.append(escape(text[start : match.start()]))
+        parts.append(_Slot(match.group(1), encode))
+        start = match.end()
+    parts.append(escape(text[start:]))
+
+    if quote:
+        parts.append('"')
+
+
+def _merge_literals(parts):
+    merged = []
+    for part in parts:
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        elif part != "":
+            merged.append(part)
+
+    return merged
+
+
+def lookup(context, path):
+    """Return the value at the dotted `path` in `context`, e.g. `user.id` or
+    `items.0`, or None if there is none.
+    """
+    value = context
+    for key in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, (list, tuple)) and key.isdigit():
+            index = int(key)
+            value = value[index] if index < len(value) else None
+        else:
+            return None
+
+    return value
+
+
+def _escape_json(text):
+    return json.dumps(text)[1:-1]
+
+
+def _encode_json(value):
+    return json.dumps(value)
+
+
+def _encode_json_string(value):
+    return _escape_json(_encode_text(value))
+
+
+def _encode_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+
+    return str(value)
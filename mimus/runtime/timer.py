@@ -0,0 +1,162 @@
+"""
+timer schedules delayed responses on a hierarchical timer wheel.
+"""
+import asyncio
+import math
+
+__all__ = (
+    "DEFAULT_TICK",
+    "TimerWheel",
+)
+
+
+DEFAULT_TICK = 0.001
+
+
+class TimerWheel:
+    """A hierarchical timer wheel driven by one event loop callback per tick.
+
+    Every level has `slots` buckets. A bucket in level 0 spans one tick, and a
+    bucket in level `n` spans `slots ** n` ticks. Timers are added to the
+    lowest level that can hold them and move down a level when the wheel
+    below completes a turn. Adding and firing a timer are O(1). All timers in
+    a bucket are released together, so the event loop only sees one callback
+    per tick however many requests are delayed.
+
+    The wheel only ticks while it holds timers.
+    """
+
+    def __init__(self, tick=DEFAULT_TICK, slots=256, levels=4, loop=None):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+
+        self._loop = loop
+        self._wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._now = 0
+        self._origin = None
+        self._handle = None
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def sleep(self, delay):
+        """Return a future that is resolved after `delay` seconds, rounded up
+        to the tick.
+        """
+        loop = self._get_loop()
+        future = loop.create_future()
+        self.call_later(delay, _resolve, future)
+
+        return future
+
+    def call_later(self, delay, callback, *args):
+        """Call `callback(*args)` after `delay` seconds, rounded up to the
+        tick.
+        """
+        loop = self._get_loop()
+        if self._origin is None:
+            self._origin = loop.time()
+            self._now = 0
+
+        # Ticks are counted from the origin, so catch up before computing the
+        # expiry of the timer.
+        elapsed = self._elapsed_ticks(loop.time())
+        if elapsed > self._now and self._count == 0:
+            self._now = elapsed
+
+        # _run can move the wheel a tick ahead of the clock, and the bucket of
+        # the current tick only fires again after a full turn.
+        expiry = max(elapsed, self._now) + max(1, math.ceil(delay / self.tick))
+        self._add(expiry, (callback, args))
+        self._count += 1
+
+        if self._handle is None:
+            self._schedule(loop)
+
+    def _get_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+
+        return self._loop
+
+    def _elapsed_ticks(self, now):
+        return int((now - self._origin) / self.tick)
+
+    def _add(self, expiry, entry):
+        delta = expiry - self._now
+        if delta <= 0:
+            self._wheels[0][self._now % self.slots].append((expiry, entry))
+            return
+
+        for level in range(self.levels):
+            if delta < self._spans[level + 1] or level == self.levels - 1:
+                span = self._spans[level]
+                # Timers beyond the top level wait in its furthest bucket
+                # and are placed again when it cascades.
+                expiry_slot = min(expiry, self._now + self._spans[level + 1] - span)
+                index = (expiry_slot // span) % self.slots
+                self._wheels[level][index].append((expiry, entry))
+                return
+
+    def _schedule(self, loop):
+        when = self._origin + (self._now + 1) * self.tick
+        self._handle = loop.call_at(when, self._run)
+
+    def _run(self):
+        self._handle = None
+        loop = self._get_loop()
+        # call_at may run a little before the tick because of the clock
+        # resolution of the loop, so always advance at least one tick.
+        target = max(self._elapsed_ticks(loop.time()), self._now + 1)
+
+        while self._now < target and self._count:
+            self._now += 1
+            self._cascade()
+            self._fire()
+
+        if self._count:
+            self._schedule(loop)
+
+    def _cascade(self):
+        for level in range(1, self.levels):
+            if self._now % self._spans[level]:
+                break
+
+            index = (self._now // self._spans[level]) % self.slots
+            bucket = self._wheels[level][index]
+            self._wheels[level][index] = []
+            for expiry, entry in bucket:
+                self._add(expiry, entry)
+
+    def _fire(self):
+        index = self._now % self.slots
+        bucket = self._wheels[0][index]
+        if not bucket:
+            return
+
+        self._wheels[0][index] = []
+        pending = []
+        for expiry, entry in bucket:
+            if expiry > self._now:
+                pending.append((expiry, entry))
+                continue
+
+            callback, args = entry
+            self._count -= 1
+            try:
+                callback(*args)
+            except Exception as e:  # pylint: disable=broad-except
+                self._get_loop().call_exception_handler(
+                    dict(message="Exception in timer wheel callback", exception=e)
+                )
+
+        for expiry, entry in pending:
+            self._add(expiry, entry)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,151 @@
+"""
+tls builds and shares SSL contexts for services with `tlscert` and `tlskey`.
+"""
+import ssl
+import sys
+
+from ..config.error import ConfigError
+
+__all__ = (
+    "TLSContextCache",
+    "default_cache",
+    "uses_tls",
+)
+
+
+def uses_tls(service):
+    attrs = service.protocol_attrs
+    return bool(attrs.get("tlscert") or attrs.get("tlskey"))
+
+
+class TLSContextCache:
+    """Builds one `ssl.SSLContext` per unique certificate, key and options,
+    so services sharing a certificate pair share the context.
+
+    Sharing a context also shares its session cache and session ticket keys.
+    Clients can then resume sessions with any service using the same
+    certificate. Contexts built before the runtime forks worker processes
+    are inherited by the workers, so resumption works across workers too.
+    """
+
+    def __init__(self):
+        self._contexts = {}
+
+    def get(self, cert, key, alpn=()):
+        """Return the server context for `cert` and `key`. The paths are
+        resolved against the config folder when the config is parsed.
+        """
+        options = (str(cert), str(key), tuple(alpn))
+        if options not in self._contexts:
+            self._contexts[options] = _create_context(*options)
+
+        return self._contexts[options]
+
+    def for_service(self, service, alpn=()):
+        cert, key = _cert_pair(service)
+        try:
+            return self.get(cert, key, alpn)
+        except (OSError, ssl.SSLError) as e:
+            raise ConfigError(
+                f"Cannot load certificate '{cert}' and key '{key}'",
+                service=service.name,
+            ) from e
+
+    def for_listener(self, services, alpn=()):
+        """Return the context for services sharing a listening socket.
+
+        The first service's context is the default one. If the services have
+        different hosts and certificates, the context is chosen by the SNI
+        server name during the handshake.
+        """
+        services = list(services)
+        with_tls = [service for service in services if uses_tls(service)]
+        if not with_tls:
+            return None
+        if len(with_tls) != len(services):
+            raise ConfigError(
+                "Services sharing a port should either all use TLS or not",
+                service=", ".join(service.name for service in services),
+            )
+
+        default = self.for_service(with_tls[0], alpn)
+        by_host = {}
+        pairs = {}
+        for service in with_tls:
+            context = self.for_service(service, alpn)
+            host = service.host.lower() if service.host else ""
+            if host and host not in by_host:
+                by_host[host] = context
+                pairs[host] = tuple(map(str, _cert_pair(service)))
+
+        if all(context is default for context in by_host.values()):
+            return default
+
+        return self._with_sni(with_tls[0], by_host, pairs, alpn)
+
+    def _with_sni(self, service, by_host, pairs, alpn):
+        # A context dispatching on SNI has its own callback, so it cannot be
+        # the shared context of a single certificate. Build a new one with
+        # the same certificate instead. It is cached by the certificate pair
+        # of every host, since listeners with the same hosts may map them to
+        # different certificates.
+        cert, key = _cert_pair(service)
+        options = (
+            "sni",
+            str(cert),
+            str(key),
+            tuple(alpn),
+            tuple(sorted(pairs.items())),
+        )
+        if options in self._contexts:
+            return self._contexts[options]
+
+        context = _create_context(str(cert), str(key), tuple(alpn))
+
+        def sni_callback(ssl_object, server_name, _context):
+            if server_name:
+                selected = by_host.get(server_name.lower())
+                if selected is not None:
+                    ssl_object.context = selected
+
+        context.sni_callback = sni_callback
+        self._contexts[options] = context
+        return context
+
+
+default_cache = TLSContextCache()
+
+
+def _cert_pair(service):
+    attrs = service.protocol_attrs
+    cert, key = attrs.get("tlscert"), attrs.get("tlskey")
+    if not cert or not key:
+        raise ConfigError(
+            "tlscert and tlskey should be defined together", service=service.name
+        )
+
+    return cert, key
+
+
+def _create_context(cert, key, alpn):
+    # create_default_context(Purpose.CLIENT_AUTH) only returns a server
+    # context since Python 3.10, and num_tickets needs one.
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.options |= (
+        ssl.OP_NO_COMPRESSION
+        | ssl.OP_CIPHER_SERVER_PREFERENCE
+        | ssl.OP_SINGLE_DH_USE
+        | ssl.OP_SINGLE_ECDH_USE
+    )
+    context.load_cert_chain(cert, key)
+
+    # Session tickets allow clients to resume without a full handshake.
+    context.options &= ~ssl.OP_NO_TICKET  # pylint: disable=no-member
+    if sys.version_info >= (3, 8):
+        context.num_tickets = 2
+
+    if alpn:
+        context.set_alpn_protocols(list(alpn))
+
+    return context
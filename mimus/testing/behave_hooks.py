@@ -0,0 +1,39 @@
+"""
+behave_hooks runs mock environments from a fork server in behave features.
+"""
+from .forkserver import ForkServer
+
+__all__ = (
+    "after_all",
+    "after_scenario",
+    "before_all",
+    "before_scenario",
+)
+
+
+def before_all(context):
+    """Start the fork server of the config given with
+    `-D mimus_config=<path>`, if any.
+    """
+    config = context.config.userdata.get("mimus_config")
+    if config:
+        context.mimus_forkserver = ForkServer.from_file(config).start()
+
+
+def before_scenario(context, _scenario):
+    """Start a fresh mock environment as `context.mimus`."""
+    server = getattr(context, "mimus_forkserver", None)
+    if server is not None:
+        context.mimus = server.spawn()
+
+
+def after_scenario(context, _scenario):
+    env = getattr(context, "mimus", None)
+    if env is not None:
+        env.stop()
+
+
+def after_all(context):
+    server = getattr(context, "mimus_forkserver", None)
+    if server is not None:
+        server.close()
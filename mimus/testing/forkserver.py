@@ -0,0 +1,270 @@
+"""
+forkserver forks pre-warmed mock environments for tests.
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+import traceback
+from pathlib import Path
+
+from ..config.parser import Parser
+from ..runtime.handler import load_handler
+from ..runtime.server import Runtime
+
+__all__ = (
+    "ForkServer",
+    "ForkServerError",
+    "MockEnvironment",
+)
+
+
+class ForkServerError(RuntimeError):
+    pass
+
+
+class ForkServer:
+    """Starts mock environments in milliseconds by forking them from a
+    process that has already done the slow part of starting one.
+
+    `start` imports the handlers of the services parsed by `parser` and
+    validates the services by building a `Runtime`, then forks a zygote
+    process that inherits all of it. Each `spawn` asks the zygote to
+    fork a new process running the services on fresh ports, so environments
+    are isolated from each other and from the caller.
+
+    Requires `os.fork`, so it is not available on Windows.
+    """
+
+    def __init__(self, parser, host="127.0.0.1"):
+        self.parser = parser
+        self.host = host
+        self.pid = None
+        self._sock = None
+        self._reader = None
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        path = Path(path)
+        return cls(Parser.parse(path.read_text(), path.parent, str(path)), **kwargs)
+
+    def start(self):
+        if not hasattr(os, "fork"):
+            raise ForkServerError("The fork server requires os.fork")
+
+        services = list(self.parser.iter_service())
+        _preload(services, self.host)
+
+        parent, child = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent.close()
+            code = 0
+            try:
+                _Zygote(child, services, self.host).run()
+            except BaseException:  # pylint: disable=broad-except
+                # os._exit skips the interpreter's own error report.
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)  # pylint: disable=protected-access
+
+        child.close()
+        self.pid = pid
+        self._sock = parent
+        self._reader = parent.makefile("rb")
+        return self
+
+    def spawn(self, services=None):
+        """Fork an environment running `services`, a list of service names,
+        or all the services.
+        """
+        reply = self._request(op="spawn", services=services)
+        return MockEnvironment(self, reply["pid"], reply["ports"], self.host)
+
+    def stop_environment(self, pid):
+        """Stop the environment forked as process `pid`."""
+        self._request(op="stop", pid=pid)
+
+    def close(self):
+        if self.pid is None:
+            return
+
+        try:
+            self._send(op="exit")
+        except OSError:
+            pass
+        os.waitpid(self.pid, 0)
+        self._reader.close()
+        self._sock.close()
+        self.pid = None
+
+    def _request(self, **command):
+        if self.pid is None:
+            raise ForkServerError("The fork server is not started")
+
+        self._send(**command)
+        line = self._reader.readline()
+        if not line:
+            raise ForkServerError("The fork server exited")
+
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ForkServerError(reply["error"])
+
+        return reply
+
+    def _send(self, **command):
+        self._sock.sendall(json.dumps(command).encode() + b"\n")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MockEnvironment:
+    """The services running in a process forked by a `ForkServer`."""
+
+    def __init__(self, server, pid, ports, host):
+        self.server = server
+        self.pid = pid
+        self.ports = ports
+        self.host = host
+
+    def address(self, name):
+        return self.host, self.ports[name]
+
+    def url(self, name, scheme="http"):
+        return f"{scheme}://{self.host}:{self.ports[name]}"
+
+    def stop(self):
+        if self.pid is not None:
+            self.server.stop_environment(self.pid)
+            self.pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _preload(services, host):
+    for service in services:
+        if service.handler:
+            load_handler(service.handler)
+
+    # Validates the services and loads what the runtime needs, without
+    # binding any port.
+    Runtime(services, host=host)
+
+
+class _Zygote:
+    def __init__(self, sock, services, host):
+        self.sock = sock
+        self.services = services
+        self.host = host
+        self.children = set()
+
+    def run(self):
+        try:
+            for line in self.sock.makefile("rb"):
+                command = json.loads(line)
+                self._reap()
+                if command["op"] == "exit":
+                    break
+                if command["op"] == "spawn":
+                    reply = self._spawn(command.get("services"))
+                else:
+                    reply = self._stop(command["pid"])
+                self.sock.sendall(json.dumps(reply).encode() + b"\n")
+        finally:
+            for pid in list(self.children):
+                self._stop(pid)
+
+    def _spawn(self, names):
+        services = self.services
+        if names is not None:
+            unknown = set(names) - {service.name for service in services}
+            if unknown:
+                return {"error": f"Unknown service(s) {', '.join(sorted(unknown))}"}
+            services = [service for service in services if service.name in names]
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            self.sock.close()
+            code = 0
+            try:
+                asyncio.run(_serve(services, self.host, write))
+            except BaseException:  # pylint: disable=broad-except
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)  # pylint: disable=protected-access
+
+        os.close(write)
+        with os.fdopen(read, "rb") as pipe:
+            result = pipe.read()
+
+        if not result:
+            os.waitpid(pid, 0)
+            return {"error": "The environment exited while starting"}
+
+        result = json.loads(result)
+        if "error" in result:
+            os.waitpid(pid, 0)
+            return result
+
+        self.children.add(pid)
+        return {"pid": pid, "ports": result["ports"]}
+
+    def _stop(self, pid):
+        if pid not in self.children:
+            return {"error": f"Unknown environment {pid}"}
+
+        self.children.discard(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+        return {}
+
+    def _reap(self):
+        # Environments can also exit on their own, e.g. if killed.
+        for pid in list(self.children):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.discard(pid)
+
+
+async def _serve(services, host, pipe):
+    runtime = Runtime(services, host=host)
+    try:
+        ports = await runtime.start()
+    except Exception as e:  # pylint: disable=broad-except
+        # The error is reported to the caller of `spawn`.
+        await runtime.stop()
+        os.write(pipe, json.dumps({"error": str(e)}).encode())
+        os.close(pipe)
+        return
+
+    os.write(pipe, json.dumps({"ports": ports}).encode())
+    os.close(pipe)
+
+    loop = asyncio.get_event_loop()
+    stopped = loop.create_future()
+    loop.add_signal_handler(signal.SIGTERM, stopped.set_result, None)
+    try:
+        await stopped
+    finally:
+        await runtime.stop()
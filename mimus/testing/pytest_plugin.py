@@ -0,0 +1,51 @@
+"""
+pytest_plugin provides fixtures running mock environments from a fork server.
+"""
+import pytest
+
+from .forkserver import ForkServer
+
+__all__ = (
+    "mimus_env",
+    "mimus_forkserver",
+)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--mimus-config", help="mimus config file of the mimus_env fixture."
+    )
+    parser.addini("mimus_config", "mimus config file of the mimus_env fixture.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "mimus(services): only run these services in mimus_env."
+    )
+
+
+@pytest.fixture(scope="session")
+def mimus_forkserver(request):
+    """The fork server of the config given by --mimus-config or the
+    mimus_config ini option, started once per session.
+    """
+    config = request.config.getoption("--mimus-config") or request.config.getini(
+        "mimus_config"
+    )
+    if not config:
+        raise pytest.UsageError("mimus_env requires --mimus-config or mimus_config")
+
+    with ForkServer.from_file(config) as server:
+        yield server
+
+
+@pytest.fixture
+def mimus_env(mimus_forkserver, request):  # pylint: disable=redefined-outer-name
+    """A fresh mock environment for each test. The services can be selected
+    with `@pytest.mark.mimus(services=[...])`.
+    """
+    marker = request.node.get_closest_marker("mimus")
+    services = marker.kwargs.get("services") if marker else None
+
+    with mimus_forkserver.spawn(services) as env:
+        yield env
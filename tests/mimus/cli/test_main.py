@@ -0,0 +1,195 @@
+from click.testing import CliRunner
+
+from mimus.cli.main import main
+from mimus.config.parser import BasicServiceItem
+from mimus.runtime.loadgen import build_request, summarize
+
+CONFIG = """
+services:
+    - name: hello
+      method: get
+      path: /hello/*
+      response:
+        template: hello
+
+    - name: other
+      response:
+        template: other
+
+    - name: missing
+      path: /missing
+      response:
+        status: 404
+        template: missing
+
+    - name: head
+      method: head
+      path: /head
+      response:
+        template: head
+
+    - name: ping
+      protocol: tcp
+      reply: PONG
+"""
+
+
+class Test_bench:
+    def test_bench(self, tmp_path):
+        """
+        Test if mimus bench reports every selected service.
+        """
+        config = tmp_path / "config.yml"
+        config.write_text(CONFIG)
+
+        result = CliRunner().invoke(
+            main,
+            [
+                "bench",
+                str(config),
+                "--service",
+                "hello",
+                "--duration",
+                "0.3",
+                "--connections",
+                "2",
+                "--processes",
+                "1",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        lines = result.output.splitlines()
+        assert lines[0].split()[:4] == ["service", "requests", "errors", "rps"]
+        assert len(lines) == 2
+        name, requests, errors = lines[1].split()[:3]
+        assert name == "hello"
+        assert int(requests) > 0
+        assert errors == "0"
+
+    def test_client_errors(self, tmp_path):
+        """
+        Test if mimus bench counts 4xx responses as errors.
+        """
+        config = tmp_path / "config.yml"
+        config.write_text(CONFIG)
+
+        result = CliRunner().invoke(
+            main,
+            [
+                "bench",
+                str(config),
+                "--service",
+                "missing",
+                "--duration",
+                "0.2",
+                "--connections",
+                "1",
+                "--processes",
+                "1",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        _, requests, errors = result.output.splitlines()[1].split()[:3]
+        assert requests == "0"
+        assert int(errors) > 0
+
+    def test_head(self, tmp_path):
+        """
+        Test if mimus bench does not wait for the body of HEAD responses.
+        """
+        config = tmp_path / "config.yml"
+        config.write_text(CONFIG)
+
+        result = CliRunner().invoke(
+            main,
+            [
+                "bench",
+                str(config),
+                "--service",
+                "head",
+                "--duration",
+                "0.2",
+                "--connections",
+                "1",
+                "--processes",
+                "1",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        _, requests, errors = result.output.splitlines()[1].split()[:3]
+        assert int(requests) > 0
+        assert errors == "0"
+
+    def test_skip_not_http(self, tmp_path):
+        """
+        Test if mimus bench skips the services that are not HTTP services.
+        """
+        config = tmp_path / "config.yml"
+        config.write_text(CONFIG)
+
+        result = CliRunner().invoke(
+            main,
+            ["bench", str(config), "--duration", "0.1", "--connections", "1"],
+        )
+
+        assert result.exit_code == 0, result.output
+        names = [line.split()[0] for line in result.output.splitlines()[1:]]
+        assert names == ["hello", "other", "missing", "head"]
+
+    def test_not_http_service(self, tmp_path):
+        """
+        Test if mimus bench rejects the selection of services that are not
+        HTTP services.
+        """
+        config = tmp_path / "config.yml"
+        config.write_text(CONFIG)
+
+        result = CliRunner().invoke(main, ["bench", str(config), "--service", "ping"])
+
+        assert result.exit_code != 0
+        assert "not HTTP service(s) ping" in result.output
+
+    def test_unknown_service(self, tmp_path):
+        """
+        Test if mimus bench rejects unknown service names.
+        """
+        config = tmp_path / "config.yml"
+        config.write_text(CONFIG)
+
+        result = CliRunner().invoke(main, ["bench", str(config), "--service", "x"])
+
+        assert result.exit_code != 0
+        assert "unknown service(s) x" in result.output
+
+
+class Test_loadgen:
+    def test_build_request(self):
+        """
+        Test if build_request matches the method, path and host of a service.
+        """
+        service = BasicServiceItem(
+            name="name",
+            host="example.com",
+            protocol_attrs={"method": "post", "path": "/a/*/[ab].js"},
+        )
+
+        assert build_request(service) == (
+            b"POST /a/x/x.js HTTP/1.1\r\nHost: example.com\r\n"
+            b"Content-Length: 0\r\n\r\n"
+        )
+
+    def test_summarize(self):
+        """
+        Test if summarize computes throughput and percentiles.
+        """
+        result = summarize([i / 1000 for i in range(1, 1001)], 0, 2.0, cpu=0.5)
+
+        assert result.requests == 1000
+        assert result.rps == 500
+        assert result.p50 == 0.5
+        assert result.p99 == 0.99
+        assert result.p999 == 0.999
+        assert result.cpu_per_request == 0.0005
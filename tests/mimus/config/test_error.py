@@ -1,6 +1,6 @@
 import pytest
 
-from mimus.config.error import ConfigError
+from mimus.config.error import ConfigError, ConfigErrorGroup
 
 
 class Test_ConfigError:
@@ -15,3 +15,16 @@ class Test_ConfigError:
             raise ConfigError("reason", meta1="", meta2="meta2", meta3=1)
 
         assert str(excinfo.value) == "reason (meta2=meta2, meta3=1)"
+
+
+class Test_ConfigErrorGroup:
+    def test_errors(self):
+        with pytest.raises(ConfigError) as excinfo:
+            raise ConfigErrorGroup(
+                [ConfigError("reason1", item=1), ConfigError("reason2")]
+            )
+
+        assert len(excinfo.value.errors) == 2
+        assert str(excinfo.value) == (
+            "2 invalid config item(s)\n  - reason1 (item=1)\n  - reason2"
+        )
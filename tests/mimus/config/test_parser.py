@@ -268,6 +268,40 @@ version: -1
             else:
                 ConfigFile.loads(case.content, datadir)
 
+    def test_tls_paths(self, datadir):
+        """
+        Test if tlscert and tlskey are resolved against the config folder.
+        """
+        content = """
+services:
+    - name: name
+      tlscert: ./cert.pem
+      tlskey: ./key.pem
+"""
+
+        config = ConfigFile.loads(content, datadir)
+
+        assert config.services[0].protocol_attrs == {
+            "tlscert": str(datadir / "cert.pem"),
+            "tlskey": str(datadir / "key.pem"),
+        }
+
+    def test_journal_path(self, datadir):
+        """
+        Test if the journal path is resolved against the config folder.
+        """
+        content = """
+services:
+    - name: name
+      journal: {size: 8, path: logs/requests.jsonl}
+"""
+
+        config = ConfigFile.loads(content, datadir)
+
+        assert config.services[0].protocol_attrs == {
+            "journal": {"size": 8, "path": str(datadir / "logs/requests.jsonl")},
+        }
+
     def test_unknown_service_definition(self, datadir):
         """
         Test if we raise error if we meet unexpected service
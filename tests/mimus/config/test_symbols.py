@@ -0,0 +1,80 @@
+import pytest
+
+from mimus.config.parser import (
+    Parser,
+    StackItem,
+    TemplateServiceItem,
+    BasicServiceItem,
+    ConfigError,
+)
+from mimus.config.symbols import Location, SymbolTable
+
+
+class Test_SymbolTable:
+    def test_add_service(self):
+        """
+        Test if SymbolTable.add_service indexes services and templates.
+        """
+        table = SymbolTable()
+        table.add_service(BasicServiceItem(name="base"), "a.yml", 3)
+        table.add_service(TemplateServiceItem(name="derived", template="base"))
+
+        assert table.service("base") == BasicServiceItem(name="base")
+        assert table.service("unknown") is None
+        assert table.location(SymbolTable.SERVICE, "base") == Location("a.yml", 3)
+        assert table.services_derived_from("base") == ["derived"]
+
+    def test_add_duplicate_service(self):
+        """
+        Test if SymbolTable.add_service reports both locations of a duplicate
+        service.
+        """
+        table = SymbolTable()
+        table.add_service(BasicServiceItem(name="name"), "a.yml", 3)
+
+        with pytest.raises(ConfigError) as excinfo:
+            table.add_service(BasicServiceItem(name="name"), "b.yml", 5)
+
+        assert str(excinfo.value) == (
+            "Duplicate service name 'name' found "
+            "(file=b.yml, line=5, previous=a.yml:3)"
+        )
+
+    def test_add_stack(self):
+        """
+        Test if SymbolTable.add_stack accepts the same stack twice, rejects
+        a conflicting one and records which stacks use a service.
+        """
+        table = SymbolTable()
+        table.add_stack(StackItem(name="stack1", services=["service"]))
+        table.add_stack(StackItem(name="stack1", services=["service"]))
+        table.add_stack(StackItem(name="stack2", services=["service", "other"]))
+
+        assert table.stacks_using("service") == ["stack1", "stack2"]
+        assert table.stacks_using("other") == ["stack2"]
+
+        with pytest.raises(ConfigError) as excinfo:
+            table.add_stack(StackItem(name="stack1", services=["other"]))
+
+        assert "Duplicate stack name 'stack1'" in str(excinfo.value)
+
+    def test_parse_locations(self, tmp_path):
+        """
+        Test if Parser.parse records the file and line of every symbol.
+        """
+        content = """
+stacks:
+    - name: stack
+      services:
+        - name
+
+services:
+    - stack: stack
+    - name: name
+"""
+        file = str(tmp_path / "config.yml")
+        parser = Parser.parse(content, tmp_path, file)
+
+        assert parser.symbols.location(SymbolTable.STACK, "stack") == Location(file, 3)
+        assert parser.symbols.location(SymbolTable.SERVICE, "name") == Location(file, 9)
+        assert parser.symbols.stacks_using("name") == ["stack"]
@@ -0,0 +1,92 @@
+from functools import partial
+
+import pytest
+
+from mimus.config.error import ConfigErrorGroup
+from mimus.config.parser import (
+    BasicServiceItem,
+    ConfigFile,
+    Parser,
+    StackServiceItem,
+)
+from mimus.config.validate import validate_services
+
+
+def parse(item, cwd):
+    return ConfigFile._parse_service_in(item, cwd)
+
+
+class Test_validate_services:
+    def test_valid(self, tmp_path):
+        """
+        Test if validate_services parses every definition in order.
+        """
+        items = [{"name": f"service{i}", "port": i} for i in range(10)]
+        items.append({"stack": "stack"})
+
+        services = validate_services(items, partial(parse, cwd=tmp_path), chunksize=3)
+
+        assert services[:2] == [
+            BasicServiceItem(name="service0", port=0),
+            BasicServiceItem(name="service1", port=1),
+        ]
+        assert services[-1] == StackServiceItem(stack="stack")
+        assert len(services) == 11
+
+    def test_aggregate_errors(self, tmp_path):
+        """
+        Test if validate_services reports every invalid service instead of
+        only the first one.
+        """
+        items = [
+            {"name": "ok"},
+            {"name": "bad-port", "port": 65536},
+            {"name": ""},
+            {"name": "ok"},
+        ]
+
+        with pytest.raises(ConfigErrorGroup) as excinfo:
+            validate_services(items, partial(parse, cwd=tmp_path), chunksize=2)
+
+        messages = [str(e) for e in excinfo.value.errors]
+        assert messages == [
+            "port should be an int in the range of [0, 65535] "
+            "(item=2, name=bad-port)",
+            "name should be a non-empty string (item=3)",
+            "Duplicate service name 'ok' found (item=4)",
+        ]
+
+    def test_workers(self, tmp_path):
+        """
+        Test if validate_services gives the same result on a process pool.
+        """
+        items = [{"name": f"service{i}", "port": i} for i in range(10)]
+        parse_in = partial(ConfigFile._parse_service_in, cwd=tmp_path)
+
+        assert validate_services(
+            items, parse_in, workers=2, chunksize=4
+        ) == validate_services(items, parse_in)
+
+    def test_config_file(self, tmp_path):
+        """
+        Test if ConfigFile.loads validates services as a batch when workers
+        is given.
+        """
+        content = """
+services:
+    - name: a
+    - name: a
+    - name: b
+      port: -1
+"""
+
+        with pytest.raises(ConfigErrorGroup) as excinfo:
+            ConfigFile.loads(content, tmp_path, workers=1)
+
+        assert len(excinfo.value.errors) == 2
+
+        with pytest.raises(ConfigErrorGroup) as excinfo:
+            Parser.parse(content, tmp_path, "mimus.yml", workers=1)
+
+        assert len(excinfo.value.errors) == 2
+        assert excinfo.value.meta.file.endswith("mimus.yml")
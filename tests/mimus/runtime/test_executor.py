@@ -0,0 +1,184 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem, HandlerField
+from mimus.runtime.executor import ExecutorBusy, HandlerExecutor, is_async_handler
+from mimus.runtime.http import Request
+from mimus.runtime.server import Endpoint
+from mimus.runtime.timer import TimerWheel
+
+HANDLERS = """
+import os
+
+def pid(request):
+    return {"pid": os.getpid(), "path": request.path}
+"""
+
+SCRIPT = """
+import asyncio
+import sys
+
+from mimus.config.parser import HandlerField
+from mimus.runtime.executor import HandlerExecutor
+
+async def main():
+    executor = HandlerExecutor("name", kind="process")
+    field = HandlerField("executor_handlers:pid", sys.argv[1])
+    await executor.run(field, None, None)
+    executor.shutdown()
+
+asyncio.run(main())
+"""
+
+
+class Test_HandlerExecutor:
+    def test_is_async_handler(self):
+        """
+        Test if coroutine functions and objects are detected as async.
+        """
+
+        async def handler(request):
+            pass
+
+        class Handler:
+            async def __call__(self, request):
+                pass
+
+        assert is_async_handler(handler)
+        assert is_async_handler(Handler())
+        assert not is_async_handler(lambda request: None)
+
+    def test_from_service(self):
+        """
+        Test if the executor is configured by the executor attribute.
+        """
+        service = BasicServiceItem(name="name")
+        executor = HandlerExecutor.from_service(service)
+        assert (executor.kind, executor.workers) == ("thread", 4)
+
+        service.protocol_attrs = {"executor": "process"}
+        assert HandlerExecutor.from_service(service).kind == "process"
+
+        for config in ("fiber", {"workers": 0}, {"size": 1}, ["thread"]):
+            service.protocol_attrs = {"executor": config}
+            with pytest.raises(ConfigError):
+                HandlerExecutor.from_service(service)
+
+    def test_offload(self):
+        """
+        Test if blocking handlers don't block the event loop.
+        """
+        service = BasicServiceItem(name="name")
+        endpoint = Endpoint(service, TimerWheel())
+        endpoint.handler = lambda request: time.sleep(0.2)
+        endpoint.executor = HandlerExecutor("name")
+
+        async def main():
+            task = asyncio.ensure_future(endpoint(Request("GET", "/")))
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            assert time.perf_counter() - start < 0.1
+            assert (await task).status == 204
+
+        asyncio.run(main())
+        endpoint.executor.shutdown()
+
+    def test_max_queue(self):
+        """
+        Test if calls over the queue limit are rejected and counted.
+        """
+        release = threading.Event()
+        executor = HandlerExecutor("name", workers=1, max_queue=1)
+
+        async def main():
+            calls = [
+                asyncio.ensure_future(executor.run(None, lambda r: release.wait(), 1))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            with pytest.raises(ExecutorBusy):
+                await executor.run(None, lambda r: None, 1)
+
+            assert executor.metrics.pending == 2
+            release.set()
+            await asyncio.gather(*calls)
+
+        asyncio.run(main())
+        executor.shutdown()
+
+        metrics = executor.metrics
+        assert (metrics.submitted, metrics.completed, metrics.rejected) == (2, 2, 1)
+        assert (metrics.pending, metrics.peak_pending) == (0, 2)
+
+    def test_busy_time(self):
+        """
+        Test if the busy time only counts the time spent in the handler.
+        """
+        executor = HandlerExecutor("name", workers=1)
+
+        def fail(request):
+            time.sleep(0.1)
+            raise ValueError(request)
+
+        async def main():
+            calls = [executor.run(None, fail, index) for index in range(2)]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.run(main())
+        executor.shutdown()
+
+        assert all(isinstance(result, ValueError) for result in results)
+        metrics = executor.metrics
+        assert (metrics.completed, metrics.failed) == (0, 2)
+        # The second call waited 0.1s for the first one.
+        assert 0.2 <= metrics.busy_time < 0.28
+
+    def test_process(self, tmp_path):
+        """
+        Test if process executors import and call the handler in a worker.
+        """
+        tmp_path.joinpath("executor_handlers.py").write_text(HANDLERS)
+        field = HandlerField("executor_handlers:pid", tmp_path)
+        service = BasicServiceItem(
+            name="name", handler=field, protocol_attrs={"executor": "process"}
+        )
+        endpoint = Endpoint(service, TimerWheel())
+
+        async def main():
+            return await endpoint(Request("GET", "/path"))
+
+        response = asyncio.run(main())
+        endpoint.executor.shutdown()
+
+        assert response.status == 200
+        assert b'"path": "/path"' in response.body
+        assert f'"pid": {os.getpid()}'.encode() not in response.body
+
+    def test_process_exit(self, tmp_path):
+        """
+        Test if the interpreter exits cleanly after a process executor is
+        shut down on the event loop.
+        """
+        tmp_path.joinpath("executor_handlers.py").write_text(
+            HANDLERS.replace("request.path", "request")
+        )
+
+        stderr = tmp_path / "stderr"
+        with stderr.open("wb") as f:
+            # The workers would keep a pipe open if the script hangs.
+            process = subprocess.run(
+                [sys.executable, "-c", SCRIPT, str(tmp_path)],
+                stderr=f,
+                timeout=30,
+                check=False,
+            )
+
+        assert process.returncode == 0
+        assert stderr.read_bytes() == b""
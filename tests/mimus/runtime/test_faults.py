@@ -0,0 +1,86 @@
+import asyncio
+import random
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.runtime.faults import FaultInjector, LatencyModel
+from mimus.runtime.timer import TimerWheel
+
+
+class Test_LatencyModel:
+    def test_distributions(self):
+        """
+        Test if every distribution samples within its bounds, in seconds.
+        """
+        rng = random.Random(0)
+
+        fixed = LatencyModel.from_attrs(20, rng=rng)
+        assert fixed.sample() == 0.02
+
+        uniform = LatencyModel("uniform", rng=rng, min=10, max=30)
+        assert all(0.01 <= uniform.sample() <= 0.03 for _ in range(100))
+
+        normal = LatencyModel("normal", rng=rng, mean=20, stddev=100)
+        assert all(normal.sample() >= 0 for _ in range(100))
+
+        percentiles = LatencyModel.from_attrs(
+            {"distribution": "percentiles", "percentiles": {50: 10, 100: 100}},
+            rng=rng,
+        )
+        samples = sorted(percentiles.sample() for _ in range(1000))
+        assert samples[0] >= 0.01
+        assert samples[-1] <= 0.1
+        assert samples[400] == 0.01
+
+    def test_invalid(self):
+        """
+        Test if LatencyModel rejects unknown distributions and parameters.
+        """
+        cases = [
+            dict(distribution="unknown"),
+            dict(distribution="uniform", min=10),
+            dict(distribution="fixed", value=-1),
+            dict(distribution="percentiles", percentiles={101: 1}),
+        ]
+
+        for case in cases:
+            with pytest.raises(ConfigError):
+                LatencyModel.from_attrs(case)
+
+
+class Test_FaultInjector:
+    def test_from_attrs(self):
+        """
+        Test if FaultInjector.from_attrs reads latency and errors.
+        """
+        assert FaultInjector.from_attrs({}) is None
+
+        injector = FaultInjector.from_attrs(
+            {"latency": 5, "errors": {"rate": 1, "status": 500}}
+        )
+        assert injector.delay() == 0.005
+        assert injector.should_fail()
+
+        with pytest.raises(ConfigError):
+            FaultInjector.from_attrs({"errors": {"rate": 2}})
+
+    def test_apply(self):
+        """
+        Test if FaultInjector.apply delays the request on the timer wheel and
+        returns the error status.
+        """
+
+        async def main():
+            wheel = TimerWheel()
+            loop = asyncio.get_event_loop()
+
+            injector = FaultInjector.from_attrs({"latency": 10})
+            start = loop.time()
+            assert await injector.apply(wheel) is None
+            assert loop.time() - start >= 0.01
+
+            injector = FaultInjector.from_attrs({"errors": {"rate": 1}})
+            assert await injector.apply(wheel) == 503
+
+        asyncio.run(main())
@@ -0,0 +1,86 @@
+import struct
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.runtime.framing import (
+    FramingError,
+    LengthPrefixedFramer,
+    LineFramer,
+    framer_factory,
+)
+
+
+def frames(framer, *chunks):
+    return [bytes(frame) for chunk in chunks for frame in framer.feed(chunk)]
+
+
+class Test_LengthPrefixedFramer:
+    def test_feed(self):
+        """
+        Test if LengthPrefixedFramer splits frames across and within chunks.
+        """
+        data = b"".join(struct.pack(">H", len(p)) + p for p in (b"ab", b"", b"cde"))
+        framer = LengthPrefixedFramer(size=2)
+
+        assert frames(framer, data[:1], data[1:5], data[5:]) == [b"ab", b"", b"cde"]
+        assert frames(LengthPrefixedFramer(size=2), data) == [b"ab", b"", b"cde"]
+
+    def test_frames_are_views(self):
+        """
+        Test if frames are released views of the received data.
+        """
+        framer = LengthPrefixedFramer(size=1)
+        kept = []
+        for frame in framer.feed(b"\x02ab"):
+            assert frame.obj == b"\x02ab"
+            kept.append(frame)
+
+        with pytest.raises(ValueError):
+            bytes(kept[0])
+
+    def test_encode(self):
+        """
+        Test if LengthPrefixedFramer prefixes payloads with their length.
+        """
+        framer = LengthPrefixedFramer(size=4, byteorder="little")
+        assert b"".join(framer.encode(b"abc")) == b"\x03\x00\x00\x00abc"
+
+    def test_too_long(self):
+        """
+        Test if LengthPrefixedFramer rejects frames over max_length.
+        """
+        with pytest.raises(FramingError):
+            frames(LengthPrefixedFramer(size=1, max_length=1), b"\x02ab")
+
+
+class Test_LineFramer:
+    def test_feed(self):
+        """
+        Test if LineFramer splits lines, keeping incomplete ones for later.
+        """
+        framer = LineFramer(delimiter="\r\n")
+
+        assert frames(framer, b"PING\r", b"\nGET a\r\nSE") == [b"PING", b"GET a"]
+        assert frames(framer, b"T b\r\n") == [b"SET b"]
+        assert b"".join(framer.encode(b"+OK")) == b"+OK\r\n"
+
+    def test_too_long(self):
+        """
+        Test if LineFramer rejects lines over max_length.
+        """
+        with pytest.raises(FramingError):
+            frames(LineFramer(max_length=3), b"abcd")
+
+
+class Test_framer_factory:
+    def test_factory(self):
+        """
+        Test if framer_factory builds the framer set by the framing attribute.
+        """
+        assert isinstance(framer_factory({})(), LineFramer)
+        assert framer_factory({"framing": {"kind": "length", "size": 2}})().size == 2
+
+        for framing in ("http", {"kind": "line", "size": 2}, ["line"]):
+            with pytest.raises(ConfigError):
+                framer_factory({"framing": framing})
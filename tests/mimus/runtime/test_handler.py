@@ -0,0 +1,50 @@
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import HandlerField
+from mimus.runtime.handler import load_handler
+
+
+class Test_load_handler:
+    def test_same_module_name(self, tmp_path):
+        """
+        Test if handler modules with the same name in different folders are
+        loaded from their own folder.
+        """
+        for name in ("one", "two"):
+            folder = tmp_path / name
+            folder.mkdir()
+            folder.joinpath("run.py").write_text(f"def main():\n    return '{name}'\n")
+
+        one = load_handler(HandlerField("run:main", tmp_path / "one"))
+        two = load_handler(HandlerField("run:main", tmp_path / "two"))
+
+        assert (one(), two()) == ("one", "two")
+
+    def test_package(self, tmp_path):
+        """
+        Test if handlers are loaded from packages in the folder, which can
+        import their own modules.
+        """
+        package = tmp_path / "handlers"
+        package.mkdir()
+        package.joinpath("__init__.py").write_text("")
+        package.joinpath("util.py").write_text("VALUE = 'util'\n")
+        package.joinpath("api.py").write_text(
+            "from .util import VALUE\n\ndef main():\n    return VALUE\n"
+        )
+
+        assert load_handler(HandlerField("handlers.api:main", tmp_path))() == "util"
+
+    def test_invalid(self, tmp_path):
+        """
+        Test if invalid handler references are reported.
+        """
+        tmp_path.joinpath("invalid_handlers.py").write_text("VALUE = 1\n")
+
+        for fqn in ("invalid_handlers", "missing_module:main", "invalid_handlers:x"):
+            with pytest.raises(ConfigError):
+                load_handler(HandlerField(fqn, tmp_path))
+
+        with pytest.raises(ConfigError):
+            load_handler(HandlerField("invalid_handlers:VALUE", tmp_path))
@@ -0,0 +1,190 @@
+import asyncio
+
+import pytest
+
+from mimus.runtime.http import Headers, HTTPError, HTTPProtocol, Request, Response
+
+
+class FakeTransport(asyncio.Transport):
+    def __init__(self):
+        super().__init__()
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    def writelines(self, list_of_data):
+        for data in list_of_data:
+            self.write(data)
+
+    def close(self):
+        self.closed = True
+
+    def is_closing(self):
+        return self.closed
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+
+async def echo(request):
+    return Response(body=f"{request.method} {request.target} {request.body!r}".encode())
+
+
+def feed(*chunks):
+    async def main():
+        transport = FakeTransport()
+        protocol = HTTPProtocol(echo)
+        protocol.connection_made(transport)
+        for chunk in chunks:
+            protocol.data_received(chunk)
+            await asyncio.sleep(0)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        protocol.connection_lost(None)
+        return transport
+
+    return asyncio.run(main())
+
+
+class Test_Headers:
+    def test_parse(self):
+        """
+        Test if Headers.parse keeps raw values and looks up names
+        case-insensitively.
+        """
+        headers = Headers.parse([b"Host: example.com", b"X-Empty:", b"A: 1 "])
+
+        assert headers.get("host") == "example.com"
+        assert headers.get(b"x-empty") == ""
+        assert headers.get("a") == "1"
+        assert headers.get("missing", "default") == "default"
+        assert headers.items() == [("host", "example.com"), ("x-empty", ""), ("a", "1")]
+
+    def test_malformed(self):
+        """
+        Test if Headers.parse rejects malformed header lines.
+        """
+        for line in (b"no-colon", b"Space : value", b": value"):
+            with pytest.raises(HTTPError):
+                Headers.parse([line])
+
+
+class Test_Request:
+    def test_fields(self):
+        """
+        Test if Request splits the target and reads the host header.
+        """
+        request = Request(
+            "GET",
+            "/path?a=1&b=2&a=3",
+            headers=Headers([(b"host", b"example.com:8080")]),
+            body=b'{"user_id": 1}',
+        )
+
+        assert request.path == "/path"
+        assert request.params == {"a": "1", "b": "2"}
+        assert request.host == "example.com"
+        assert request.json() == {"user_id": 1}
+        assert request.keep_alive
+        assert request.context(["body", "unknown"]) == {"body": {"user_id": 1}}
+
+    def test_keep_alive(self):
+        """
+        Test if keep-alive follows the HTTP version and connection header.
+        """
+        close = Headers([(b"connection", b"close")])
+        keep_alive = Headers([(b"connection", b"Keep-Alive")])
+
+        assert not Request("GET", "/", "1.1", close).keep_alive
+        assert not Request("GET", "/", "1.0").keep_alive
+        assert Request("GET", "/", "1.0", keep_alive).keep_alive
+
+
+class Test_Response:
+    def test_from_result(self):
+        """
+        Test if Response.from_result converts handler results.
+        """
+        assert Response.from_result(None).status == 204
+        assert Response.from_result(b"body").body == b"body"
+        assert Response.from_result("text").headers == {
+            "content-type": "text/plain; charset=utf-8"
+        }
+        assert Response.from_result({"a": 1}).body == b'{"a": 1}'
+
+
+class Test_HTTPProtocol:
+    def test_pipelining(self):
+        """
+        Test if pipelined requests, split at arbitrary points, are answered in
+        order on one connection.
+        """
+        transport = feed(
+            b"GET /a HTTP/1.1\r\nHost: x\r\n\r\nPOST /b HTTP/1.1\r\nContent-Le",
+            b"ngth: 3\r\n\r\nabcGET /c HTTP/1.1\r\n\r\n",
+        )
+
+        responses = bytes(transport.data).split(b"HTTP/1.1 200 OK")[1:]
+        assert [r.rsplit(b"\r\n\r\n", 1)[1] for r in responses] == [
+            b"GET /a b''",
+            b"POST /b b'abc'",
+            b"GET /c b''",
+        ]
+        assert b"connection: close" not in transport.data
+        assert not transport.closed
+
+    def test_chunked(self):
+        """
+        Test if chunked request bodies are decoded.
+        """
+        transport = feed(
+            b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n",
+            b"2;ext=1\r\nde\r\n0\r\n\r\n",
+        )
+
+        assert transport.data.endswith(b"POST / b'abcde'")
+
+    def test_close(self):
+        """
+        Test if the connection is closed after a request asking for it, and
+        after HTTP/1.0 requests.
+        """
+        for request in (
+            b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n",
+            b"GET / HTTP/1.0\r\n\r\n",
+        ):
+            transport = feed(request)
+
+            assert b"connection: close" in transport.data
+            assert transport.closed
+
+    def test_keep_alive_10(self):
+        """
+        Test if HTTP/1.0 requests asking for a persistent connection are told
+        it is kept open.
+        """
+        transport = feed(b"GET / HTTP/1.0\r\nConnection: keep-alive\r\n\r\n")
+
+        assert b"connection: keep-alive" in transport.data
+        assert not transport.closed
+
+        transport = feed(b"GET / HTTP/1.1\r\n\r\n")
+        assert b"connection: " not in transport.data
+
+    def test_malformed(self):
+        """
+        Test if malformed requests are answered with an error and the
+        connection is closed.
+        """
+        transport = feed(b"GET / HTTP/2.5\r\n\r\n")
+
+        assert transport.data.startswith(b"HTTP/1.1 505 HTTP Version Not Supported")
+        assert transport.closed
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem, Parser
+from mimus.runtime.http import Headers, Request
+from mimus.runtime.journal import JournalWriter, RequestJournal
+from mimus.runtime.server import Runtime
+
+CONFIG = """
+services:
+    - name: users
+      path: /users/*
+      journal: {size: 2}
+"""
+
+
+def request(target, method="GET", body=b""):
+    return Request(method, target, headers=Headers([(b"host", b"a")]), body=body)
+
+
+class Test_RequestJournal:
+    def test_from_service(self):
+        """
+        Test if the journal is configured by the journal attribute.
+        """
+        service = BasicServiceItem(name="name")
+        assert RequestJournal.from_service(service) is None
+
+        for config, size in ((True, 1024), (8, 8), ({"size": 4}, 4)):
+            service.protocol_attrs = {"journal": config}
+            assert RequestJournal.from_service(service).size == size
+
+        for config in (0, "yes", {"length": 1}):
+            service.protocol_attrs = {"journal": config}
+            with pytest.raises(ConfigError):
+                RequestJournal.from_service(service)
+
+    def test_ring(self):
+        """
+        Test if the journal keeps the last requests and drops older ones.
+        """
+        journal = RequestJournal("name", size=3, max_body=2)
+        for index in range(5):
+            journal.record(request(f"/{index}", body=b"body"), 200)
+
+        assert [record.target for record in journal] == ["/2", "/3", "/4"]
+        assert (len(journal), journal.count, journal.dropped) == (3, 5, 2)
+        assert journal.last().target == "/4"
+        assert journal.last().body == b"bo"
+
+        journal.clear()
+        assert list(journal) == [] and journal.last() is None
+
+    def test_requests(self):
+        """
+        Test if recorded requests can be queried by method, path and status.
+        """
+        journal = RequestJournal("name")
+        journal.record(request("/users/1?x=1"), 200)
+        journal.record(request("/users/2", method="POST"), 201)
+        journal.record(request("/orders/1"), 404)
+
+        assert len(journal.requests()) == 3
+        assert [r.target for r in journal.requests(path="/users/*")] == [
+            "/users/1?x=1",
+            "/users/2",
+        ]
+        assert [r.target for r in journal.requests(method="post")] == ["/users/2"]
+        assert [r.target for r in journal.requests(status=404)] == ["/orders/1"]
+
+
+class Test_JournalWriter:
+    def test_write(self, tmp_path):
+        """
+        Test if records are appended to the file as JSON lines.
+        """
+        path = tmp_path / "journal.jsonl"
+        journal = RequestJournal("name", path=str(path))
+        journal.record(request("/a", body=b"\xff"), 200)
+        journal.record(request("/b"), 404)
+        journal.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["target"] for line in lines] == ["/a", "/b"]
+        assert lines[0]["service"] == "name"
+        assert lines[0]["headers"] == [["host", "a"]]
+        assert lines[0]["body"] == "\\xff"
+
+    def test_max_pending(self, tmp_path):
+        """
+        Test if records over max_pending are dropped and counted.
+        """
+        writer = JournalWriter(str(tmp_path / "journal.jsonl"), interval=60)
+        writer.max_pending = 0
+        writer.append(None)
+        writer.close()
+
+        assert writer.dropped == 1
+
+
+class Test_Runtime:
+    def test_journal(self):
+        """
+        Test if the runtime records the requests of services with a journal.
+        """
+        parser = Parser.parse(CONFIG, Path("."))
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                reader, writer = await asyncio.open_connection(
+                    runtime.host, runtime.ports["users"]
+                )
+                writer.write(b"GET /users/1 HTTP/1.1\r\nHost: a\r\n\r\n")
+                writer.write(b"GET /other HTTP/1.1\r\nConnection: close\r\n\r\n")
+                await reader.read()
+                writer.close()
+
+                return runtime.journals["users"]
+
+        journal = asyncio.run(main())
+        assert [(r.target, r.status) for r in journal] == [("/users/1", 200)]
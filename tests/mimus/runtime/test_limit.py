@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem
+from mimus.runtime.http import Request
+from mimus.runtime.limit import (
+    ConcurrencyLimit,
+    ServiceLimits,
+    SharedLimitStore,
+    TokenBucket,
+)
+from mimus.runtime.server import Endpoint
+from mimus.runtime.timer import TimerWheel
+
+
+def service(**attrs):
+    return BasicServiceItem(name="name", protocol_attrs=attrs)
+
+
+class Test_TokenBucket:
+    def test_acquire(self):
+        """
+        Test if TokenBucket allows a burst and then refills at its rate.
+        """
+        bucket = TokenBucket(rate=100, burst=5)
+
+        assert [bucket.acquire() for _ in range(6)] == [True] * 5 + [False]
+        time.sleep(0.025)
+        assert bucket.acquire()
+
+    def test_invalid(self):
+        """
+        Test if TokenBucket rejects non-positive rates.
+        """
+        with pytest.raises(ConfigError):
+            TokenBucket(rate=0)
+
+
+class Test_ConcurrencyLimit:
+    def test_acquire(self):
+        """
+        Test if ConcurrencyLimit caps the requests in flight.
+        """
+        limit = ConcurrencyLimit(2)
+
+        assert limit.acquire() and limit.acquire()
+        assert not limit.acquire()
+        limit.release()
+        assert limit.inflight == 1
+        assert limit.acquire()
+
+
+class Test_ServiceLimits:
+    def test_from_service(self):
+        """
+        Test if ServiceLimits reads numbers and dicts from protocol_attrs.
+        """
+        assert ServiceLimits.from_service(service()) is None
+
+        limits = ServiceLimits.from_service(
+            service(rate_limit=1, max_concurrency={"limit": 1, "status": 502})
+        )
+        assert limits.enter() is None
+        assert limits.enter() == 429
+        limits.exit()
+
+        limits = ServiceLimits.from_service(service(max_concurrency=1))
+        assert limits.enter() is None
+        assert limits.enter() == 503
+
+        with pytest.raises(ConfigError) as excinfo:
+            ServiceLimits.from_service(service(rate_limit={"burst": 1}))
+        assert "service=name" in str(excinfo.value)
+
+    def test_shared(self):
+        """
+        Test if limits in a SharedLimitStore are enforced across processes.
+        """
+        store = SharedLimitStore(["name"])
+        limits = ServiceLimits.from_service(
+            service(rate_limit={"rate": 0.001, "burst": 10}), store
+        )
+
+        def worker():
+            os._exit(sum(limits.enter() is None for _ in range(10)))
+
+        processes = [multiprocessing.Process(target=worker) for _ in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert sum(process.exitcode for process in processes) == 10
+        assert limits.enter() == 429
+
+    def test_endpoint(self):
+        """
+        Test if an endpoint answers with the configured status when limited.
+        """
+
+        async def main():
+            endpoint = Endpoint(
+                service(rate_limit={"rate": 1, "burst": 1}), TimerWheel()
+            )
+
+            assert (await endpoint(Request("GET", "/"))).status == 200
+            response = await endpoint(Request("GET", "/"))
+            assert response.status == 429
+            assert response.headers == {"retry-after": 1}
+
+        asyncio.run(main())
@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem
+from mimus.runtime.http import Headers, Request
+from mimus.runtime.matcher import Matcher, MatchTable, RequestValues
+
+
+class Endpoint:
+    def __init__(self, name, host="", **attrs):
+        self.name = name
+        self.matcher = Matcher(
+            BasicServiceItem(name=name, host=host, protocol_attrs=attrs)
+        )
+
+
+def request(target="/", body=b"", **headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request("POST", target, headers=Headers(raw), body=body)
+
+
+class Test_Matcher:
+    def test_rules(self):
+        """
+        Test if Matcher checks method, host, path and match rules.
+        """
+        matcher = Endpoint(
+            "name",
+            host="example.com",
+            method="post",
+            path="/users/*",
+            match={
+                "query": {"page": 1},
+                "headers": {"X-Tenant": "acme-*"},
+                "json": {"user.id": 42},
+            },
+        ).matcher
+
+        def matches(req):
+            return matcher.matches(RequestValues(req))
+
+        assert matches(
+            request(
+                "/users/1?page=1",
+                b'{"user": {"id": 42}}',
+                host="example.com",
+                x_tenant="acme-1",
+            )
+        )
+        assert not matches(
+            request(
+                "/users/1?page=1",
+                b'{"user": {"id": "42"}}',
+                host="example.com",
+                x_tenant="acme-1",
+            )
+        )
+        assert not matches(request("/users/1?page=1", b"not json", x_tenant="acme"))
+
+    def test_json_types(self):
+        """
+        Test if Matcher compares the types of JSON values.
+        """
+        matcher = Endpoint("name", match={"json": {"flag": 1, "ids": [1]}}).matcher
+
+        def matches(body):
+            return matcher.matches(RequestValues(request("/", body)))
+
+        assert matches(b'{"flag": 1, "ids": [1]}')
+        assert not matches(b'{"flag": true, "ids": [1]}')
+        assert not matches(b'{"flag": 1.0, "ids": [1]}')
+        assert not matches(b'{"flag": 1, "ids": [true]}')
+
+    def test_invalid(self):
+        """
+        Test if Matcher rejects malformed match rules.
+        """
+        for match in ("query", {"cookies": {}}, {"query": []}):
+            with pytest.raises(ConfigError):
+                Endpoint("name", match=match)
+
+
+class Test_MatchTable:
+    def test_order(self):
+        """
+        Test if MatchTable returns the first matching endpoint in definition
+        order, whether it is indexed or not.
+        """
+        endpoints = [
+            Endpoint("user1", match={"json": {"user_id": 1}}),
+            Endpoint("wildcard", match={"query": {"q": "a*"}}),
+            Endpoint("user2", match={"json": {"user_id": 2}}),
+            Endpoint("path", path="/exact"),
+            Endpoint("fallback"),
+        ]
+        table = MatchTable(endpoints)
+
+        def match(*args, **kwargs):
+            return table.match(request(*args, **kwargs)).name
+
+        assert match("/", b'{"user_id": 1}') == "user1"
+        assert match("/?q=abc", b'{"user_id": 2}') == "wildcard"
+        assert match("/", b'{"user_id": 2}') == "user2"
+        assert match("/exact") == "path"
+        assert match("/other") == "fallback"
+
+    def test_json_types(self):
+        """
+        Test if MatchTable does not mix JSON values of different types that
+        are equal in Python.
+        """
+        endpoints = [
+            Endpoint("true", match={"json": {"flag": True}}),
+            Endpoint("one", match={"json": {"flag": 1}}),
+            Endpoint("float", match={"json": {"flag": 1.5}}),
+        ]
+        table = MatchTable(endpoints)
+
+        def match(body):
+            endpoint = table.match(request("/", body))
+            return endpoint and endpoint.name
+
+        assert match(b'{"flag": true}') == "true"
+        assert match(b'{"flag": 1}') == "one"
+        assert match(b'{"flag": 1.0}') is None
+        assert match(b'{"flag": 1.5}') == "float"
+
+    def test_many_rules(self):
+        """
+        Test if MatchTable dispatches among thousands of rules by lookup.
+        """
+        endpoints = [
+            Endpoint(f"user{i}", method="post", match={"json": {"user_id": i}})
+            for i in range(5000)
+        ]
+        table = MatchTable(endpoints)
+
+        start = time.perf_counter()
+        for i in range(0, 5000, 5):
+            body = f'{{"user_id": {i}}}'.encode()
+            assert table.match(request("/", body)).name == f"user{i}"
+        assert time.perf_counter() - start < 1
+
+        assert table.match(request("/", b'{"user_id": 5000}')) is None
@@ -0,0 +1,64 @@
+import socket
+import time
+
+import pytest
+
+from mimus.config.parser import BasicServiceItem
+from mimus.runtime.ports import PortAllocator, read_discovery
+
+
+class Test_PortAllocator:
+    def test_allocate(self):
+        """
+        Test if PortAllocator.allocate reserves distinct ports for dynamic
+        services and keeps fixed ones.
+        """
+        services = [
+            BasicServiceItem(name="fixed", port=8080),
+            BasicServiceItem(name="dynamic1"),
+            BasicServiceItem(name="dynamic2"),
+        ]
+
+        with PortAllocator() as allocator:
+            ports = allocator.allocate(services)
+
+            assert ports["fixed"] == 8080
+            assert ports["dynamic1"] != ports["dynamic2"]
+            assert set(allocator.sockets) == {"dynamic1", "dynamic2"}
+
+            # The port is reserved, so nobody else can bind it.
+            with socket.socket() as sock:
+                with pytest.raises(OSError):
+                    sock.bind(("127.0.0.1", ports["dynamic1"]))
+
+            sock = allocator.take("dynamic1")
+            assert sock.getsockname()[1] == ports["dynamic1"]
+            assert allocator.take("fixed") is None
+            sock.close()
+
+    def test_allocate_many(self):
+        """
+        Test if PortAllocator.allocate handles thousands of services quickly.
+        """
+        services = [BasicServiceItem(name=f"service{i}") for i in range(2000)]
+
+        with PortAllocator() as allocator:
+            start = time.perf_counter()
+            ports = allocator.allocate(services)
+            elapsed = time.perf_counter() - start
+
+        assert len(set(ports.values())) == 2000
+        assert elapsed < 2
+
+    def test_discovery(self, tmp_path):
+        """
+        Test if the discovery file round trips the name to port map.
+        """
+        path = tmp_path / "ports.json"
+
+        with PortAllocator() as allocator:
+            ports = allocator.allocate([BasicServiceItem(name="service")])
+            allocator.write_discovery(path)
+
+        assert read_discovery(path) == ports
+        assert [p.name for p in tmp_path.iterdir()] == ["ports.json"]
@@ -0,0 +1,173 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem, Parser
+from mimus.runtime.adapters import ProtocolAdapter, get_adapter, register_adapter
+from mimus.runtime.executor import HandlerExecutor
+from mimus.runtime.raw import RawEndpoint
+from mimus.runtime.server import Runtime
+
+CONFIG = """
+services:
+    - name: echo
+      protocol: tcp
+      framing: {kind: length, size: 2}
+      handler: raw_handlers:echo
+
+    - name: ping
+      protocol: tcp
+      reply: PONG
+
+    - name: dns
+      protocol: udp
+      handler: raw_handlers:upper
+"""
+
+HANDLERS = """
+import asyncio
+
+def echo(frame):
+    return frame
+
+async def upper(data):
+    await asyncio.sleep(0)
+    return data.upper()
+
+async def fragile(line):
+    await asyncio.sleep(0)
+    if line == b"boom":
+        raise ValueError(line)
+    return line.upper()
+"""
+
+
+class Test_Adapters:
+    def test_get_adapter(self):
+        """
+        Test if adapters are selected by protocol, and plugins can be added.
+        """
+        assert get_adapter("http") is get_adapter("")
+        assert get_adapter("udp").socket_type == socket.SOCK_DGRAM
+
+        class Custom(ProtocolAdapter):
+            pass
+
+        custom = register_adapter("custom", Custom())
+        assert get_adapter("custom") is custom
+
+        with pytest.raises(ConfigError):
+            get_adapter("gopher")
+
+
+class Test_Raw:
+    def test_serve(self, tmp_path):
+        """
+        Test if raw TCP and UDP services answer frames and datagrams.
+        """
+        tmp_path.joinpath("raw_handlers.py").write_text(HANDLERS)
+        parser = Parser.parse(CONFIG, tmp_path)
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                reader, writer = await asyncio.open_connection(
+                    runtime.host, runtime.ports["echo"]
+                )
+                writer.write(b"\x00\x02ab\x00\x03c")
+                writer.write(b"de")
+                assert await reader.readexactly(9) == b"\x00\x02ab\x00\x03cde"
+                writer.close()
+
+                reader, writer = await asyncio.open_connection(
+                    runtime.host, runtime.ports["ping"]
+                )
+                writer.write(b"PING\nPING\n")
+                assert await reader.readexactly(10) == b"PONG\nPONG\n"
+                writer.close()
+
+                loop = asyncio.get_event_loop()
+                received = loop.create_future()
+
+                class Client(asyncio.DatagramProtocol):
+                    def datagram_received(self, data, addr):
+                        received.set_result(data)
+
+                transport, _ = await loop.create_datagram_endpoint(
+                    Client, remote_addr=(runtime.host, runtime.ports["dns"])
+                )
+                transport.sendto(b"query")
+                assert await asyncio.wait_for(received, 5) == b"QUERY"
+                transport.close()
+
+        asyncio.run(main())
+
+    def test_handler_error(self, tmp_path, caplog):
+        """
+        Test if a handler raising does not stop the replies to the next frames
+        of the connection.
+        """
+        tmp_path.joinpath("raw_handlers.py").write_text(HANDLERS)
+        config = """
+services:
+    - name: fragile
+      protocol: tcp
+      handler: raw_handlers:fragile
+"""
+        parser = Parser.parse(config, tmp_path)
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                reader, writer = await asyncio.open_connection(
+                    runtime.host, runtime.ports["fragile"]
+                )
+                writer.write(b"a\nboom\nb\nc\n")
+                replies = await asyncio.wait_for(reader.readexactly(6), 5)
+                writer.close()
+                return replies
+
+        assert asyncio.run(main()) == b"A\nB\nC\n"
+        assert "Error while answering a frame of fragile" in caplog.text
+
+    def test_executor(self):
+        """
+        Test if blocking handlers get a copy of the frame in the executor.
+        """
+        endpoint = RawEndpoint(BasicServiceItem(name="name", protocol="tcp"))
+        endpoint.handler = lambda frame: (frame, threading.current_thread())
+        endpoint.executor = HandlerExecutor("name")
+
+        async def main():
+            with memoryview(b"frame") as frame:
+                reply = endpoint(frame)
+            return await reply
+
+        frame, thread = asyncio.run(main())
+        endpoint.executor.shutdown()
+
+        assert frame == b"frame" and isinstance(frame, bytes)
+        assert thread is not threading.main_thread()
+
+    def test_shared_port(self):
+        """
+        Test if raw services cannot share a port with other services.
+        """
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        async def main(protocol):
+            runtime = Runtime(
+                [
+                    BasicServiceItem(name="a", protocol="tcp", port=port),
+                    BasicServiceItem(name="b", protocol=protocol, port=port),
+                ]
+            )
+            with pytest.raises(ConfigError):
+                await runtime.start()
+            await runtime.stop()
+
+        for protocol in ("tcp", "http"):
+            asyncio.run(main(protocol))
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import pytest
+
+from mimus.config.parser import BasicServiceItem, HandlerField
+from mimus.runtime.registry import ServiceRegistry, export_services
+
+SERVICES = [
+    BasicServiceItem(
+        name="service2",
+        host="example.com",
+        port=443,
+        protocol="http",
+        protocol_attrs={"path": "/api/"},
+        handler=HandlerField("run:main", "/tmp"),
+    ),
+    BasicServiceItem(name="service1", host="example.com"),
+]
+
+
+class Test_ServiceRegistry:
+    def test_export_and_attach(self, tmp_path):
+        """
+        Test if services exported into a registry file read back equal.
+        """
+        path = tmp_path / "registry"
+        assert export_services(SERVICES, path) == 1
+
+        with ServiceRegistry(path) as registry:
+            assert registry.generation == 1
+            assert len(registry) == 2
+            assert [record.name for record in registry] == ["service1", "service2"]
+
+            record = registry.find("service2")
+            assert record.port == 443
+            assert record.handler.fqn == "run:main"
+            assert record.to_service() == BasicServiceItem(
+                name="service2",
+                host="example.com",
+                port=443,
+                protocol="http",
+                protocol_attrs={"path": "/api/"},
+                handler=HandlerField("run:main", Path("/tmp")),
+            )
+            assert registry.find("service1").handler is None
+            assert registry.find("unknown") is None
+
+    def test_refresh(self, tmp_path):
+        """
+        Test if an attached registry keeps its generation until refreshed.
+        """
+        path = tmp_path / "registry"
+        export_services(SERVICES, path)
+
+        with ServiceRegistry(path) as registry:
+            assert not registry.refresh()
+
+            assert export_services(SERVICES[:1], path) == 2
+            assert len(registry) == 2
+
+            assert registry.refresh()
+            assert registry.generation == 2
+            assert [record.name for record in registry] == ["service2"]
+
+    def test_invalid_file(self, tmp_path):
+        """
+        Test if ServiceRegistry rejects files that are not registries.
+        """
+        path = tmp_path / "registry"
+        path.write_bytes(b"\0" * 64)
+
+        with pytest.raises(ValueError):
+            ServiceRegistry(path)
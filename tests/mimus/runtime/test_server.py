@@ -0,0 +1,137 @@
+import asyncio
+import socket
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import Parser, BasicServiceItem
+from mimus.runtime.server import Runtime
+
+CONFIG = """
+services:
+    - name: template
+      method: get
+      path: /users/*
+      response:
+        template:
+          user: "{{ params.user_id }}"
+
+    - name: handler
+      method: post
+      path: /echo
+      handler: handlers:echo
+
+    - name: other
+      protocol: http2
+      response:
+        template: other
+"""
+
+HANDLERS = """
+async def echo(request):
+    return {"body": request.body.decode()}
+"""
+
+
+async def request(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+@pytest.fixture
+def parser(tmp_path):
+    (tmp_path / "handlers.py").write_text(HANDLERS)
+    return Parser.parse(CONFIG, tmp_path)
+
+
+class Test_Runtime:
+    def test_serve(self, parser):
+        """
+        Test if Runtime serves every service on its own port and answers
+        pipelined requests on a persistent connection.
+        """
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                port = runtime.ports["template"]
+                assert port != runtime.ports["other"]
+
+                response = await request(
+                    port,
+                    b"GET /users/1?user_id=1 HTTP/1.1\r\n\r\n"
+                    b"GET /users/2?user_id=2 HTTP/1.1\r\n\r\n"
+                    b"GET /unknown HTTP/1.1\r\nConnection: close\r\n\r\n",
+                )
+
+                responses = response.split(b"HTTP/1.1 ")[1:]
+                assert responses[0].startswith(b"200 OK")
+                assert responses[0].endswith(b'{"user": "1"}')
+                assert responses[1].endswith(b'{"user": "2"}')
+                assert responses[2].startswith(b"404 Not Found")
+
+                response = await request(
+                    runtime.ports["handler"],
+                    b"POST /echo HTTP/1.1\r\nContent-Length: 2\r\n"
+                    b"Connection: close\r\n\r\nhi",
+                )
+                assert response.endswith(b'{"body": "hi"}')
+
+        asyncio.run(main())
+
+    def test_http2(self, parser):
+        """
+        Test if services with protocol http2 accept h2c with prior
+        knowledge.
+        """
+        h2 = pytest.importorskip("h2.connection")
+        import h2.events
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", runtime.ports["other"]
+                )
+
+                conn = h2.connection.H2Connection()
+                conn.initiate_connection()
+                conn.send_headers(
+                    1,
+                    [
+                        (":method", "GET"),
+                        (":path", "/"),
+                        (":scheme", "http"),
+                        (":authority", "localhost"),
+                    ],
+                    end_stream=True,
+                )
+                writer.write(conn.data_to_send())
+
+                body = b""
+                ended = False
+                while not ended:
+                    data = await reader.read(65536)
+                    assert data
+                    for event in conn.receive_data(data):
+                        if isinstance(event, h2.events.DataReceived):
+                            body += event.data
+                        if isinstance(event, h2.events.StreamEnded):
+                            ended = True
+                    writer.write(conn.data_to_send())
+
+                writer.close()
+                assert body == b"other"
+
+        asyncio.run(main())
+
+    def test_unsupported_protocol(self):
+        """
+        Test if Runtime rejects services with unknown protocols.
+        """
+        with pytest.raises(ConfigError) as excinfo:
+            Runtime([BasicServiceItem(name="name", protocol="gopher")])
+
+        assert "Unsupported protocol 'gopher'" in str(excinfo.value)
@@ -0,0 +1,343 @@
+import asyncio
+import io
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem, Parser
+from mimus.runtime.http import HTTPProtocol, Request, Response, StreamingResponse
+from mimus.runtime.journal import RequestJournal
+from mimus.runtime.server import Endpoint, Runtime
+from mimus.runtime.streaming import SyntheticPayload, encode_event, iter_chunks
+from mimus.runtime.timer import TimerWheel
+
+CONFIG = """
+services:
+    - name: download
+      path: /download
+      payload: {size: 1M, seed: 7, chunk_size: 4K}
+
+    - name: stream
+      path: /stream
+      handler: streaming_handlers:stream
+
+    - name: events
+      path: /events
+      handler: streaming_handlers:events
+"""
+
+HANDLERS = """
+import asyncio
+
+from mimus.runtime.http import StreamingResponse
+
+async def numbers():
+    for number in range(3):
+        await asyncio.sleep(0)
+        yield f"{number}\\n"
+
+def stream(request):
+    return numbers()
+
+def events(request):
+    return StreamingResponse.event_stream([{"event": "tick", "data": {"n": 1}}])
+"""
+
+
+class Transport(asyncio.Transport):
+    def __init__(self):
+        super().__init__()
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    def writelines(self, list_of_data):
+        for data in list_of_data:
+            self.write(data)
+
+    def is_closing(self):
+        return False
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+
+async def get(port, path, version="1.1"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/{version}\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def dechunk(body):
+    data = bytearray()
+    while True:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size, 16)
+        if size == 0:
+            return bytes(data)
+        data += body[:size]
+        body = body[size + 2 :]
+
+
+class Test_SyntheticPayload:
+    def test_payload(self):
+        """
+        Test if synthetic payloads have the given size and depend on the seed.
+        """
+        payload = SyntheticPayload("10K", seed=1, chunk_size=4096)
+        data = b"".join(payload)
+
+        assert [len(chunk) for chunk in payload] == [4096, 4096, 2048]
+        assert len(data) == payload.size == 10240
+        assert data == b"".join(SyntheticPayload(10240, seed=1, chunk_size="4k"))
+        assert data != b"".join(SyntheticPayload(10240, seed=2, chunk_size=4096))
+        assert data[:4096] != data[4096:8192]
+
+    def test_from_attrs(self):
+        """
+        Test if the payload is configured by the payload attribute.
+        """
+        assert SyntheticPayload.from_attrs({}) is None
+        assert SyntheticPayload.from_attrs({"payload": "2G"}).size == 2 << 30
+
+        for config in ("2T", -1, {"size": 1, "chunk_size": 0}, {"length": 1}):
+            with pytest.raises(ConfigError):
+                SyntheticPayload.from_attrs({"payload": config})
+
+
+class Test_iter_chunks:
+    def test_sources(self):
+        """
+        Test if files, generators and async generators are read and closed.
+        """
+        closed = []
+
+        def sync():
+            try:
+                yield "a"
+                yield b"b"
+            finally:
+                closed.append("sync")
+
+        async def agen():
+            try:
+                yield b"c"
+            finally:
+                closed.append("async")
+
+        async def read(body, chunk_size=2):
+            return [bytes(chunk) async for chunk in iter_chunks(body, chunk_size)]
+
+        file = io.BytesIO(b"abcde")
+        assert asyncio.run(read(file)) == [b"ab", b"cd", b"e"]
+        assert file.closed
+        assert asyncio.run(read(sync())) == [b"a", b"b"]
+        assert asyncio.run(read(agen())) == [b"c"]
+        assert closed == ["sync", "async"]
+
+    def test_executor(self):
+        """
+        Test if sync iterables are read off the event loop.
+        """
+        threads = []
+
+        def slow():
+            for chunk in (b"a", b"b"):
+                threads.append(threading.current_thread())
+                time.sleep(0.05)
+                yield chunk
+
+        async def main():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.ensure_future(tick())
+            chunks = [bytes(chunk) async for chunk in iter_chunks(slow())]
+            ticker.cancel()
+            return chunks, ticks
+
+        chunks, ticks = asyncio.run(main())
+        assert chunks == [b"a", b"b"]
+        assert ticks >= 5
+        assert threading.main_thread() not in threads
+
+    def test_encode_event(self):
+        """
+        Test if events are encoded as server-sent events.
+        """
+        assert encode_event("a\nb") == b"data: a\ndata: b\n\n"
+        assert encode_event({"event": "e", "id": 1, "data": [1]}) == (
+            b"event: e\nid: 1\ndata: [1]\n\n"
+        )
+
+
+class Test_StreamingResponse:
+    def test_from_result(self):
+        """
+        Test if generators and files returned by handlers are streamed.
+        """
+
+        async def agen():
+            yield b""
+
+        for result in ((c for c in "ab"), agen(), io.BytesIO(b"")):
+            assert isinstance(Response.from_result(result), StreamingResponse)
+
+    def test_backpressure(self):
+        """
+        Test if chunks are only produced while the transport is writable.
+        """
+        produced = []
+
+        def chunks():
+            for index in range(3):
+                produced.append(index)
+                yield b"x" * 10
+
+        async def app(request):
+            return StreamingResponse(chunks())
+
+        async def main():
+            transport = Transport()
+            protocol = HTTPProtocol(app)
+            protocol.connection_made(transport)
+            protocol.pause_writing()
+            protocol.data_received(b"GET / HTTP/1.1\r\n\r\n")
+            # Chunks of sync iterables are produced in the executor.
+            await asyncio.sleep(0.05)
+            assert produced == [0]
+
+            protocol.resume_writing()
+            await asyncio.sleep(0.05)
+            protocol.connection_lost(None)
+            return transport.data
+
+        data = asyncio.run(main())
+        assert produced == [0, 1, 2]
+        head, _, body = bytes(data).partition(b"\r\n\r\n")
+        assert b"transfer-encoding: chunked" in head
+        assert dechunk(body) == b"x" * 30
+
+    def test_limits_and_journal(self):
+        """
+        Test if a streamed response holds its concurrency slot, and is
+        recorded, until its body is sent.
+        """
+        service = BasicServiceItem(
+            name="name", protocol_attrs={"max_concurrency": 1, "journal": True}
+        )
+        journal = RequestJournal.from_service(service)
+        endpoint = Endpoint(service, TimerWheel(), journal=journal)
+
+        async def main():
+            response = await endpoint(Request("GET", "/"))
+            assert (await endpoint(Request("GET", "/"))).status == 503
+            assert [record.status for record in journal] == [503]
+
+            transport = Transport()
+            protocol = HTTPProtocol(endpoint)
+            protocol.connection_made(transport)
+            await protocol.send(Request("GET", "/"), response, keep_alive=True)
+
+            assert [record.status for record in journal] == [503, 200]
+            assert (await endpoint(Request("GET", "/"))).status == 200
+
+        endpoint.payload = SyntheticPayload(1024)
+        asyncio.run(main())
+
+    def test_serve(self, tmp_path):
+        """
+        Test if the runtime streams payloads, generators and events.
+        """
+        tmp_path.joinpath("streaming_handlers.py").write_text(HANDLERS)
+        parser = Parser.parse(CONFIG, Path(tmp_path))
+        expected = b"".join(SyntheticPayload("1M", seed=7, chunk_size=4096))
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                ports = runtime.ports
+                return (
+                    await get(ports["download"], "/download"),
+                    await get(ports["stream"], "/stream"),
+                    await get(ports["stream"], "/stream", version="1.0"),
+                    await get(ports["events"], "/events"),
+                )
+
+        download, stream, stream_10, events = asyncio.run(main())
+
+        head, _, body = download.partition(b"\r\n\r\n")
+        assert b"content-length: 1048576" in head
+        assert body == expected
+
+        head, _, body = stream.partition(b"\r\n\r\n")
+        assert b"transfer-encoding: chunked" in head
+        assert dechunk(body) == b"0\n1\n2\n"
+
+        head, _, body = stream_10.partition(b"\r\n\r\n")
+        assert b"transfer-encoding" not in head and b"connection: close" in head
+        assert body == b"0\n1\n2\n"
+
+        head, _, body = events.partition(b"\r\n\r\n")
+        assert b"content-type: text/event-stream" in head
+        assert dechunk(body) == b'event: tick\ndata: {"n": 1}\n\n'
+
+    def test_http2(self):
+        """
+        Test if bodies larger than the HTTP/2 flow control window are
+        streamed as the client opens the window.
+        """
+        h2 = pytest.importorskip("h2.connection")
+        import h2.events
+
+        config = "services:\n  - name: a\n    protocol: http2\n    payload: 1M\n"
+        parser = Parser.parse(config, Path("."))
+
+        async def main():
+            async with Runtime.from_parser(parser) as runtime:
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", runtime.ports["a"]
+                )
+                conn = h2.connection.H2Connection()
+                conn.initiate_connection()
+                conn.send_headers(
+                    1,
+                    [
+                        (":method", "GET"),
+                        (":path", "/"),
+                        (":scheme", "http"),
+                        (":authority", "localhost"),
+                    ],
+                    end_stream=True,
+                )
+                writer.write(conn.data_to_send())
+
+                body = bytearray()
+                ended = False
+                while not ended:
+                    data = await reader.read(65536)
+                    assert data
+                    for event in conn.receive_data(data):
+                        if isinstance(event, h2.events.DataReceived):
+                            body += event.data
+                            conn.acknowledge_received_data(
+                                event.flow_controlled_length, event.stream_id
+                            )
+                        if isinstance(event, h2.events.StreamEnded):
+                            ended = True
+                    writer.write(conn.data_to_send())
+
+                writer.close()
+                return bytes(body)
+
+        assert asyncio.run(main()) == b"".join(SyntheticPayload("1M"))
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.runtime.template import ResponseTemplate
+
+
+class Test_ResponseTemplate:
+    def test_render_json(self):
+        """
+        Test if a YAML structure renders as JSON with values from the context.
+        """
+        template = ResponseTemplate(
+            {
+                "id": "{{ params.user_id }}",
+                "greeting": 'hello "{{ params.name }}"',
+                "tags": ["{{ body.tags }}", 1, None],
+            }
+        )
+
+        body = template.render(
+            {"params": {"user_id": 42, "name": "ian"}, "body": {"tags": ["a"]}}
+        )
+
+        assert json.loads(body) == {
+            "id": 42,
+            "greeting": 'hello "ian"',
+            "tags": [["a"], 1, None],
+        }
+        assert template.variables == ("body.tags", "params.name", "params.user_id")
+        assert template.headers == {"content-type": "application/json"}
+
+    def test_render_text(self):
+        """
+        Test if a string template renders as plain text and missing values
+        render as empty strings.
+        """
+        template = ResponseTemplate("user {{ params.user_id }}{{ params.missing }}")
+
+        assert template.render({"params": {"user_id": "1"}}) == b"user 1"
+
+    def test_cache(self):
+        """
+        Test if rendered bodies are cached by the values the template uses.
+        """
+        template = ResponseTemplate({"id": "{{ params.id }}"}, cache_size=2)
+
+        first = template.render({"params": {"id": 1, "unused": 1}})
+        second = template.render({"params": {"id": 1, "unused": 2}})
+
+        assert first is second
+        assert template.render({"params": {"id": 2}}) == b'{"id": 2}'
+
+    def test_cache_types(self):
+        """
+        Test if equal values of different types are not served from the cache.
+        """
+        template = ResponseTemplate({"id": "{{ params.id }}"})
+
+        assert template.render({"params": {"id": 1}}) == b'{"id": 1}'
+        assert template.render({"params": {"id": True}}) == b'{"id": true}'
+        assert template.render({"params": {"id": 1.0}}) == b'{"id": 1.0}'
+
+    def test_from_attrs(self):
+        """
+        Test if ResponseTemplate.from_attrs reads the 'response' attribute.
+        """
+        assert ResponseTemplate.from_attrs({}) is None
+
+        template = ResponseTemplate.from_attrs(
+            {"response": {"status": 201, "template": "ok"}}
+        )
+        assert template.status == 201
+        assert template.render({}) == b"ok"
+
+        with pytest.raises(ConfigError):
+            ResponseTemplate.from_attrs({"response": "ok"})
@@ -0,0 +1,75 @@
+import asyncio
+
+from mimus.runtime.timer import TimerWheel
+
+
+class Test_TimerWheel:
+    def test_sleep(self):
+        """
+        Test if TimerWheel.sleep resolves futures in order of their delays
+        and stops ticking when empty.
+        """
+
+        async def main():
+            wheel = TimerWheel(tick=0.001, slots=4, levels=3)
+            loop = asyncio.get_event_loop()
+            start = loop.time()
+            finished = []
+
+            async def sleep(delay):
+                await wheel.sleep(delay)
+                finished.append((delay, loop.time() - start))
+
+            delays = [0.03, 0.005, 0.1, 0.015, 0.0]
+            await asyncio.gather(*(sleep(delay) for delay in delays))
+
+            assert [delay for delay, _ in finished] == sorted(delays)
+            for delay, elapsed in finished:
+                assert elapsed >= delay
+            assert len(wheel) == 0
+            assert wheel._handle is None
+
+        asyncio.run(main())
+
+    def test_overflow(self):
+        """
+        Test if timers beyond the range of the top level still fire.
+        """
+
+        async def main():
+            wheel = TimerWheel(tick=0.001, slots=2, levels=2)
+            loop = asyncio.get_event_loop()
+            start = loop.time()
+
+            await wheel.sleep(0.02)
+            assert loop.time() - start >= 0.02
+
+        asyncio.run(main())
+
+    def test_ahead_of_clock(self):
+        """
+        Test if a short delay added while the wheel is ahead of the clock does
+        not wait for a full turn of the wheel.
+        """
+
+        async def main():
+            wheel = TimerWheel(tick=0.001, slots=256, levels=2)
+            pending = wheel.sleep(1)
+            wheel._now += 3
+
+            await asyncio.wait_for(wheel.sleep(0.001), 0.1)
+            pending.cancel()
+
+        asyncio.run(main())
+
+    def test_many(self):
+        """
+        Test if thousands of concurrent delays are released.
+        """
+
+        async def main():
+            wheel = TimerWheel()
+            await asyncio.gather(*(wheel.sleep(i % 50 / 1000) for i in range(20000)))
+            assert len(wheel) == 0
+
+        asyncio.run(main())
@@ -0,0 +1,143 @@
+import asyncio
+import socket
+import ssl
+
+import pytest
+
+from mimus.config.error import ConfigError
+from mimus.config.parser import BasicServiceItem
+from mimus.runtime.server import Runtime
+from mimus.runtime.tls import TLSContextCache
+
+
+def service(name, datadir, cert, host="", port=0):
+    return BasicServiceItem(
+        name=name,
+        host=host,
+        port=port,
+        protocol_attrs={
+            "tlscert": str(datadir / f"{cert}.crt"),
+            "tlskey": str(datadir / f"{cert}.key"),
+            "response": {"template": name},
+        },
+    )
+
+
+def client_context(datadir):
+    context = ssl.create_default_context(cafile=str(datadir / "a.crt"))
+    context.load_verify_locations(str(datadir / "b.crt"))
+    context.maximum_version = ssl.TLSVersion.TLSv1_2
+    return context
+
+
+def handshake(port, context, server_name, session=None):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        with context.wrap_socket(
+            sock, server_hostname=server_name, session=session
+        ) as tls_sock:
+            tls_sock.sendall(
+                f"GET / HTTP/1.1\r\nHost: {server_name}\r\n"
+                "Connection: close\r\n\r\n".encode()
+            )
+            response = b""
+            while True:
+                data = tls_sock.recv(65536)
+                if not data:
+                    break
+                response += data
+
+            return response, tls_sock.session, tls_sock.session_reused
+
+
+class Test_TLSContextCache:
+    def test_shared_context(self, datadir):
+        """
+        Test if services with the same certificate pair share a context.
+        """
+        cache = TLSContextCache()
+
+        first = cache.for_service(service("first", datadir, "a"))
+        second = cache.for_service(service("second", datadir, "a"))
+        other = cache.for_service(service("other", datadir, "b"))
+
+        assert first is second
+        assert first is not other
+        assert cache.for_listener([service("first", datadir, "a")]) is first
+
+    def test_sni_cache_key(self, datadir):
+        """
+        Test if SNI contexts are shared by listeners mapping hosts to the same
+        certificates only.
+        """
+        cache = TLSContextCache()
+
+        first = cache.for_listener(
+            [
+                service("a", datadir, "a", host="a.example.com"),
+                service("b", datadir, "b", host="b.example.com"),
+            ]
+        )
+        swapped = cache.for_listener(
+            [
+                service("b", datadir, "a", host="b.example.com"),
+                service("a", datadir, "b", host="a.example.com"),
+            ]
+        )
+        again = cache.for_listener(
+            [
+                service("c", datadir, "a", host="a.example.com"),
+                service("d", datadir, "b", host="b.example.com"),
+            ]
+        )
+
+        assert first is not swapped
+        assert first is again
+
+    def test_invalid(self, datadir):
+        """
+        Test if TLSContextCache reports invalid TLS settings.
+        """
+        cache = TLSContextCache()
+        plain = BasicServiceItem(name="plain")
+
+        with pytest.raises(ConfigError) as excinfo:
+            cache.for_listener([service("tls", datadir, "a"), plain])
+        assert "either all use TLS or not" in str(excinfo.value)
+
+        with pytest.raises(ConfigError) as excinfo:
+            cache.for_service(service("missing", datadir, "missing"))
+        assert "Cannot load certificate" in str(excinfo.value)
+
+    def test_sni_and_resumption(self, datadir):
+        """
+        Test if services on one port are selected by SNI and clients resume
+        their TLS sessions.
+        """
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        services = [
+            service("a", datadir, "a", host="a.example.com", port=port),
+            service("b", datadir, "b", host="b.example.com", port=port),
+        ]
+        context = client_context(datadir)
+
+        async def main():
+            loop = asyncio.get_event_loop()
+            async with Runtime(services, tls=TLSContextCache()):
+                response, _, _ = await loop.run_in_executor(
+                    None, handshake, port, context, "b.example.com"
+                )
+                assert response.endswith(b"\r\n\r\nb")
+
+                _, session, _ = await loop.run_in_executor(
+                    None, handshake, port, context, "a.example.com"
+                )
+                response, _, reused = await loop.run_in_executor(
+                    None, handshake, port, context, "a.example.com", session
+                )
+                assert response.endswith(b"\r\n\r\na")
+                assert reused
+
+        asyncio.run(main())
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from mimus.testing import behave_hooks
+from mimus.testing.forkserver import ForkServer, ForkServerError
+
+CONFIG = """
+services:
+    - name: pid
+      path: /pid
+      handler: forkserver_handlers:pid
+
+    - name: hello
+      response:
+        template: hello
+"""
+
+HANDLERS = """
+import os
+
+async def pid(request):
+    return {"pid": os.getpid()}
+"""
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+@pytest.fixture
+def config(tmp_path):
+    tmp_path.joinpath("forkserver_handlers.py").write_text(HANDLERS)
+    path = tmp_path.joinpath("mimus.yml")
+    path.write_text(CONFIG)
+    return path
+
+
+class Test_ForkServer:
+    def test_spawn(self, config):
+        """
+        Test if environments are forked with their own process and ports.
+        """
+        with ForkServer.from_file(config) as server:
+            start = time.perf_counter()
+            first = server.spawn()
+            second = server.spawn(["pid"])
+            assert time.perf_counter() - start < 5
+
+            assert first.pid not in (os.getpid(), second.pid, server.pid)
+            assert set(first.ports) == {"pid", "hello"}
+            assert set(second.ports) == {"pid"}
+
+            response = asyncio.run(get(first.ports["hello"], "/"))
+            assert response.endswith(b"hello")
+            response = asyncio.run(get(second.ports["pid"], "/pid"))
+            assert f'"pid": {second.pid}'.encode() in response
+
+            first.stop()
+            with pytest.raises(OSError):
+                asyncio.run(get(first.ports["hello"], "/"))
+            assert second.url("pid") == f"http://127.0.0.1:{second.ports['pid']}"
+
+            with pytest.raises(ForkServerError):
+                server.spawn(["unknown"])
+
+        with pytest.raises(ForkServerError):
+            server.spawn()
+
+    def test_behave_hooks(self, config):
+        """
+        Test if the behave hooks give each scenario its own environment.
+        """
+        context = SimpleNamespace(
+            config=SimpleNamespace(userdata={"mimus_config": str(config)})
+        )
+        behave_hooks.before_all(context)
+        try:
+            pids = []
+            for _ in range(2):
+                behave_hooks.before_scenario(context, None)
+                pids.append(context.mimus.pid)
+                behave_hooks.after_scenario(context, None)
+                assert context.mimus.pid is None
+        finally:
+            behave_hooks.after_all(context)
+
+        assert pids[0] != pids[1]
+        assert context.mimus_forkserver.pid is None